@@ -0,0 +1,59 @@
+import os
+import random
+import sys
+import time
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import simpleobsws
+
+# Compares building the requests of an animation with Animation.requests() against a per-frame loop in the style of samples/sample_dvd_logo.py.
+# 50 scene items bounce around the screen for 600 frames while rotating, so every frame sets 3 fields of every item.
+
+ITEMS = 50
+FRAMES = 600
+ITERATIONS = 5
+BOUNDS = (1720, 880)
+
+random.seed(0)
+items = [('dvd', i) for i in range(ITEMS)]
+positions = [(random.uniform(0, BOUNDS[0]), random.uniform(0, BOUNDS[1])) for item in items]
+velocities = [(random.uniform(2.5, 4.5), random.uniform(2.5, 4.5)) for item in items]
+
+def loop():
+    ret = []
+    sleep = simpleobsws.Request('Sleep', {'sleepFrames': 1})
+    x = [position[0] for position in positions]
+    y = [position[1] for position in positions]
+    xVelocity = [velocity[0] for velocity in velocities]
+    yVelocity = [velocity[1] for velocity in velocities]
+    for frame in range(FRAMES):
+        for i, item in enumerate(items):
+            x[i] += xVelocity[i]
+            y[i] += yVelocity[i]
+            if (xVelocity[i] > 0 and x[i] >= BOUNDS[0]) or (xVelocity[i] < 0 and x[i] <= 0):
+                xVelocity[i] = -xVelocity[i]
+            if (yVelocity[i] > 0 and y[i] >= BOUNDS[1]) or (yVelocity[i] < 0 and y[i] <= 0):
+                yVelocity[i] = -yVelocity[i]
+            sceneItemTransform = {'positionX': x[i], 'positionY': y[i], 'rotation': frame * 360 / FRAMES}
+            ret.append(simpleobsws.Request('SetSceneItemTransform', {'sceneName': item[0], 'sceneItemId': item[1], 'sceneItemTransform': sceneItemTransform}))
+        ret.append(sleep)
+    return ret
+
+def animation():
+    return simpleobsws.Animation(FRAMES).bounce(items, positions, velocities, BOUNDS).tween(items, 'rotation', 0, 360).requests()
+
+def measure(function):
+    best = None
+    for i in range(ITERATIONS):
+        start = time.perf_counter()
+        requests = function()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best == None else min(best, elapsed)
+    return best * 1000, len(requests)
+
+def main():
+    print('{:>10} | {:>10} | {:>10}'.format('mode', 'ms', 'requests'))
+    for name, function in (('loop', loop), ('animation', animation)):
+        elapsed, count = measure(function)
+        print('{:>10} | {:>10.1f} | {:>10}'.format(name, elapsed, count))
+
+main()
@@ -0,0 +1,53 @@
+import os
+import sys
+import time
+import tracemalloc
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import simpleobsws
+
+# Compares building a list of RequestResponse objects from a decoded batch response, as call_batch() does, with wrapping it in a BatchResult, as call_batch(compact = True) does.
+# The batch is a 360 entry SerialFrame animation batch, which is checked for failures the way FrameScheduler does.
+
+BATCH_SIZE = 360
+ITERATIONS = 2000
+
+ws = simpleobsws.WebSocketClient()
+results = []
+for i in range(BATCH_SIZE // 2):
+    results.append({'requestType': 'SetSceneItemTransform', 'requestStatus': {'code': 100, 'result': True}})
+    results.append({'requestType': 'Sleep', 'requestStatus': {'code': 100, 'result': True}})
+
+def eager():
+    responses = [ws._build_request_response(result) for result in results]
+    return len(responses) == BATCH_SIZE and responses[-1].ok()
+
+def compact():
+    responses = simpleobsws.BatchResult(results)
+    return len(responses) == BATCH_SIZE and responses[-1].ok()
+
+def eager_all():
+    return [ws._build_request_response(result) for result in results]
+
+def compact_all():
+    # Worst case, every response is accessed
+    return list(simpleobsws.BatchResult(results))
+
+def measure(function):
+    start = time.perf_counter()
+    for i in range(ITERATIONS):
+        function()
+    return (time.perf_counter() - start) / ITERATIONS * 1e6
+
+def measure_memory(function):
+    tracemalloc.start()
+    kept = function()
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return memory
+
+def main():
+    print('{:>10} | {:>12} | {:>16} | {:>16}'.format('mode', 'check us', 'all accessed us', 'all accessed B'))
+    for name, check, access_all in (('eager', eager, eager_all), ('compact', compact, compact_all)):
+        print('{:>10} | {:>12.1f} | {:>16.1f} | {:>16}'.format(name, measure(check), measure(access_all), measure_memory(access_all)))
+
+main()
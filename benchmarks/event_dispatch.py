@@ -0,0 +1,62 @@
+import asyncio
+import os
+import sys
+import time
+from inspect import signature
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import simpleobsws
+
+# Measures how many InputVolumeMeters events per second the client can dispatch while N unrelated callbacks are registered.
+# The legacy dispatcher (linear walk + per-event signature inspection) is kept here for comparison.
+
+EVENT_COUNT = 20000
+CALLBACK_COUNTS = [1, 10, 50, 100, 500]
+
+event_payload = {'eventType': 'InputVolumeMeters', 'eventIntent': 1 << 16, 'eventData': {'inputs': []}}
+
+async def on_meters(eventData):
+    pass
+
+async def on_any(eventType, eventData):
+    pass
+
+def make_unrelated_callback():
+    async def on_unrelated(eventData):
+        pass
+    return on_unrelated
+
+def legacy_dispatch(ws, data_payload):
+    for callback, trigger in ws.event_callbacks:
+        if trigger == None:
+            params = len(signature(callback).parameters)
+            if params == 1:
+                asyncio.create_task(callback(data_payload))
+            elif params == 2:
+                asyncio.create_task(callback(data_payload['eventType'], data_payload.get('eventData')))
+            elif params == 3:
+                asyncio.create_task(callback(data_payload['eventType'], data_payload.get('eventIntent'), data_payload.get('eventData')))
+        elif trigger == data_payload['eventType']:
+            asyncio.create_task(callback(data_payload.get('eventData')))
+
+async def measure(dispatch, ws):
+    start = time.perf_counter()
+    for i in range(EVENT_COUNT):
+        dispatch(ws, event_payload)
+        if i % 100 == 0:
+            await asyncio.sleep(0) # Let the created callback tasks run so they do not pile up
+    await asyncio.sleep(0)
+    return EVENT_COUNT / (time.perf_counter() - start)
+
+async def main():
+    print('{:>10} | {:>15} | {:>15}'.format('callbacks', 'indexed ev/s', 'legacy ev/s'))
+    for count in CALLBACK_COUNTS:
+        ws = simpleobsws.WebSocketClient()
+        ws.register_event_callback(on_meters, 'InputVolumeMeters')
+        ws.register_event_callback(on_any)
+        for i in range(count):
+            ws.register_event_callback(make_unrelated_callback(), 'SomeOtherEvent{}'.format(i))
+        indexed = await measure(simpleobsws.WebSocketClient._dispatch_event, ws)
+        legacy = await measure(legacy_dispatch, ws)
+        print('{:>10} | {:>15.0f} | {:>15.0f}'.format(count, indexed, legacy))
+
+asyncio.run(main())
@@ -0,0 +1,58 @@
+import os
+import sys
+import time
+import msgpack
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import simpleobsws
+
+# Compares the time the receive task spends on decoding each kind of inbound frame, with and without lazy decoding.
+# Frames that are discarded by the lazy path (emit responses, unhandled events) are never fully decoded.
+
+FRAME_COUNT = 2000
+
+async def on_scene_changed(eventData):
+    pass
+
+async def on_event(eventType, eventData):
+    pass
+
+def encode(op, d):
+    return msgpack.packb({'d': d, 'op': op}) # obs-websocket sorts keys
+
+meters = {'inputs': [{'inputName': 'Mic {}'.format(i), 'inputLevelsMul': [[0.1, 0.2, 0.3], [0.1, 0.2, 0.3]]} for i in range(8)]}
+screenshot = {'imageData': 'data:image/png;base64,' + 'A' * 2000000}
+
+frames = [
+    ('emit response', encode(7, {'requestId': 'emit_0123456789ab-1', 'requestStatus': {'code': 100, 'result': True}, 'requestType': 'SetInputVolume'})),
+    ('emit screenshot', encode(7, {'requestId': 'emit_0123456789ab-2', 'requestStatus': {'code': 100, 'result': True}, 'requestType': 'GetSourceScreenshot', 'responseData': screenshot})),
+    ('call screenshot', encode(7, {'requestId': '0123456789ab-3', 'requestStatus': {'code': 100, 'result': True}, 'requestType': 'GetSourceScreenshot', 'responseData': screenshot})),
+    ('unhandled event', encode(5, {'eventData': meters, 'eventIntent': 1 << 16, 'eventType': 'InputVolumeMeters'})),
+    ('handled event', encode(5, {'eventData': {'sceneName': 'x' * 1024}, 'eventIntent': 1 << 2, 'eventType': 'CurrentProgramSceneChanged'})),
+]
+
+def receive(ws, message):
+    # The decoding steps of WebSocketClient._ws_recv_task
+    if ws.lazy_decode_threshold and len(message) >= ws.lazy_decode_threshold and not ws.catchall_consumers and ws._discard_message(message):
+        return
+    msgpack.unpackb(message)
+
+def measure(ws, message):
+    count = FRAME_COUNT if len(message) < 100000 else FRAME_COUNT // 20
+    start = time.perf_counter()
+    for i in range(count):
+        receive(ws, message)
+    return (time.perf_counter() - start) / count * 1e6
+
+def main():
+    lazy = simpleobsws.WebSocketClient()
+    eager = simpleobsws.WebSocketClient(lazy_decode_threshold = 0)
+    catchall = simpleobsws.WebSocketClient() # Every event is decoded for the catch-all callback, so nothing is peeked at
+    for ws in (lazy, eager, catchall):
+        ws.register_event_callback(on_scene_changed, 'CurrentProgramSceneChanged')
+        ws.waiters['0123456789ab-3'] = None
+    catchall.register_event_callback(on_event)
+    print('{:>16} | {:>10} | {:>12} | {:>12} | {:>12}'.format('frame', 'bytes', 'eager us', 'lazy us', 'catch-all us'))
+    for name, message in frames:
+        print('{:>16} | {:>10} | {:>12.2f} | {:>12.2f} | {:>12.2f}'.format(name, len(message), measure(eager, message), measure(lazy, message), measure(catchall, message)))
+
+main()
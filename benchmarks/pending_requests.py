@@ -0,0 +1,49 @@
+import asyncio
+import os
+import sys
+import time
+import tracemalloc
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import simpleobsws
+from suite import ServerProcess
+
+# Measures the cost of many concurrent call()s: memory per in-flight request, and the latency distribution of 10k concurrent calls.
+# The MockServer adds a fixed latency to every response, so anything above it is overhead of the client (and the server process).
+
+CONCURRENT_CALLS = 10000
+SERVER_LATENCY = 0.05
+
+async def timed_call(ws, request):
+    start = time.perf_counter()
+    await ws.call(request, timeout = 60)
+    return time.perf_counter() - start
+
+async def memory_per_request():
+    async with ServerProcess(latency = 5) as ws:
+        request = simpleobsws.Request('GetVersion')
+        tracemalloc.start()
+        baseline = tracemalloc.get_traced_memory()[0]
+        tasks = [asyncio.create_task(ws.call(request, timeout = 60)) for i in range(CONCURRENT_CALLS)]
+        while len(ws.waiters) < CONCURRENT_CALLS:
+            await asyncio.sleep(0.01)
+        in_flight = tracemalloc.get_traced_memory()[0] - baseline
+        tracemalloc.stop()
+        await asyncio.gather(*tasks)
+    return in_flight / CONCURRENT_CALLS
+
+async def latency_distribution():
+    async with ServerProcess(latency = SERVER_LATENCY) as ws:
+        request = simpleobsws.Request('GetVersion')
+        start = time.perf_counter()
+        latencies = sorted(await asyncio.gather(*(timed_call(ws, request) for i in range(CONCURRENT_CALLS))))
+        elapsed = time.perf_counter() - start
+    return latencies, elapsed
+
+async def main():
+    print('memory per in-flight request: {:.0f} bytes'.format(await memory_per_request()))
+    latencies, elapsed = await latency_distribution()
+    print('{} concurrent calls with {:.0f} ms server latency: p50 {:.1f} ms | p99 {:.1f} ms | max {:.1f} ms | all done in {:.1f} ms'.format(
+        CONCURRENT_CALLS, SERVER_LATENCY * 1e3, latencies[len(latencies) // 2] * 1e3, latencies[int(len(latencies) * 0.99)] * 1e3, latencies[-1] * 1e3, elapsed * 1e3))
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -0,0 +1,27 @@
+import asyncio
+import os
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import simpleobsws
+
+# Replays the events of a session log (recorded with SessionRecorder) through a client at maximum speed, and reports the dispatch rate.
+# Register the callbacks to profile in register_callbacks(), then run it under a profiler if needed.
+# Usage: python benchmarks/replay_session.py session.log
+
+async def on_event(eventType, eventData):
+    pass
+
+def register_callbacks(ws):
+    ws.register_event_callback(on_event)
+
+async def main(path):
+    metrics = simpleobsws.ClientMetrics()
+    ws = simpleobsws.WebSocketClient(metrics = metrics)
+    register_callbacks(ws)
+    result = await simpleobsws.SessionReplayer(path).replay_events(ws, speed = None)
+    print('{} events in {:.2f} s | {:.0f} events/s'.format(result['events'], result['elapsed'], result['events'] / result['elapsed'] if result['elapsed'] else 0))
+    print('{:>40} | {:>10}'.format('event type', 'count'))
+    for event_type, event in sorted(metrics.snapshot()['events'].items(), key = lambda item: -item[1]['count']):
+        print('{:>40} | {:>10}'.format(event_type, event['count']))
+
+asyncio.run(main(sys.argv[1]))
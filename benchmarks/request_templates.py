@@ -0,0 +1,61 @@
+import asyncio
+import os
+import sys
+import time
+import tracemalloc
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import simpleobsws
+
+# Compares emit() with a freshly built Request against emit_template() with a compiled RequestTemplate.
+# A null WebSocket is used, so only the client-side cost of building and encoding each message is measured.
+
+MESSAGE_COUNT = 100000
+ALLOCATION_SAMPLES = 1000
+
+class NullWebSocket:
+    async def send(self, message, text = None):
+        pass
+
+def make_client():
+    ws = simpleobsws.WebSocketClient()
+    ws.ws = NullWebSocket()
+    ws.identified = True
+    return ws
+
+template = simpleobsws.RequestTemplate('SetSceneItemTransform', {
+    'sceneName': 'dvd',
+    'sceneItemId': 1,
+    'sceneItemTransform': {'positionX': simpleobsws.TemplateField('x'), 'positionY': simpleobsws.TemplateField('y')}
+})
+
+async def send_request(ws, i):
+    await ws.emit(simpleobsws.Request('SetSceneItemTransform', {'sceneName': 'dvd', 'sceneItemId': 1, 'sceneItemTransform': {'positionX': i * 0.5, 'positionY': i * 0.25}}))
+
+async def send_template(ws, i):
+    await ws.emit_template(template, {'x': i * 0.5, 'y': i * 0.25})
+
+async def measure(send):
+    ws = make_client()
+    start = time.perf_counter()
+    for i in range(MESSAGE_COUNT):
+        await send(ws, i)
+    rate = MESSAGE_COUNT / (time.perf_counter() - start)
+
+    # Peak memory allocated while sending a single message, averaged over several messages
+    tracemalloc.start()
+    total = 0
+    for i in range(ALLOCATION_SAMPLES):
+        baseline = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        await send(ws, i)
+        total += tracemalloc.get_traced_memory()[1] - baseline
+    tracemalloc.stop()
+    return rate, total / ALLOCATION_SAMPLES
+
+async def main():
+    print('{:>10} | {:>12} | {:>18}'.format('path', 'messages/s', 'peak bytes/message'))
+    for name, send in (('emit', send_request), ('template', send_template)):
+        rate, allocated = await measure(send)
+        print('{:>10} | {:>12.0f} | {:>18.0f}'.format(name, rate, allocated))
+
+asyncio.run(main())
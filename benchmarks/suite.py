@@ -0,0 +1,135 @@
+import asyncio
+import multiprocessing
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__)))) # Uses the checkout, without installing simpleobsws
+import simpleobsws
+
+# Runs the client against a MockServer and reports call latency, emit throughput, batch throughput, event dispatch rate and memory per in-flight request.
+# The server runs in a child process, so that its own work does not count towards the client's time or memory.
+# Usage: python benchmarks/suite.py [benchmark names...]
+
+PORT = 4466
+CALL_COUNT = 2000
+EMIT_COUNT = 20000
+BATCH_SIZES = [1, 10, 100, 1000]
+BATCH_REQUESTS = 20000
+EVENT_COUNT = 20000
+IN_FLIGHT_COUNT = 5000
+
+def run_server(port, latency, ready):
+    async def main():
+        server = simpleobsws.MockServer(port = port, latency = latency)
+        def flood(request_data):
+            asyncio.get_running_loop().create_task(server.flood(request_data['eventType'], request_data.get('eventData'), request_data['count']))
+        def stats(request_data):
+            return {'requestsReceived': server.requests_received}
+        server.handlers.update({'Flood': flood, 'GetServerStats': stats})
+        await server.start()
+        ready.set()
+        await asyncio.Future()
+    asyncio.run(main())
+
+class ServerProcess:
+    def __init__(self, latency = 0):
+        self.latency = latency
+
+    async def __aenter__(self):
+        ready = multiprocessing.Event()
+        self.process = multiprocessing.Process(target = run_server, args = (PORT, self.latency, ready), daemon = True)
+        self.process.start()
+        await asyncio.get_running_loop().run_in_executor(None, ready.wait)
+        parameters = simpleobsws.IdentificationParameters(eventSubscriptions = simpleobsws.EventSubscription.All | simpleobsws.EventSubscription.InputVolumeMeters)
+        self.client = simpleobsws.WebSocketClient('ws://localhost:{}'.format(PORT), identification_parameters = parameters)
+        await self.client.connect()
+        await self.client.wait_until_identified()
+        return self.client
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.client.disconnect()
+        self.process.terminate()
+        self.process.join()
+
+async def call_latency():
+    async with ServerProcess() as ws:
+        request = simpleobsws.Request('GetVersion')
+        latencies = []
+        for i in range(CALL_COUNT):
+            start = time.perf_counter()
+            await ws.call(request)
+            latencies.append(time.perf_counter() - start)
+    latencies.sort()
+    print('call round-trip: mean {:.1f} us | p50 {:.1f} us | p99 {:.1f} us'.format(statistics.mean(latencies) * 1e6, latencies[len(latencies) // 2] * 1e6, latencies[int(len(latencies) * 0.99)] * 1e6))
+
+async def emit_throughput():
+    async with ServerProcess() as ws:
+        request = simpleobsws.Request('SetInputVolume', {'inputName': 'Mic', 'inputVolumeDb': -10.0})
+        start = time.perf_counter()
+        for i in range(EMIT_COUNT):
+            await ws.emit(request)
+        sent = time.perf_counter() - start
+        while (await ws.call(simpleobsws.Request('GetServerStats'))).responseData['requestsReceived'] <= EMIT_COUNT:
+            await asyncio.sleep(0.001)
+        processed = time.perf_counter() - start
+    print('emit: {:.0f} messages/s sent | {:.0f} messages/s processed'.format(EMIT_COUNT / sent, EMIT_COUNT / processed))
+
+async def call_batch_throughput():
+    async with ServerProcess() as ws:
+        print('{:>10} | {:>12} | {:>12}'.format('batch size', 'batches/s', 'requests/s'))
+        for size in BATCH_SIZES:
+            requests = [simpleobsws.Request('GetVersion')] * size
+            count = max(BATCH_REQUESTS // size, 10)
+            start = time.perf_counter()
+            for i in range(count):
+                await ws.call_batch(requests)
+            elapsed = time.perf_counter() - start
+            print('{:>10} | {:>12.0f} | {:>12.0f}'.format(size, count / elapsed, count * size / elapsed))
+
+async def event_dispatch():
+    async with ServerProcess() as ws:
+        received = 0
+        done = asyncio.Event()
+        async def on_meters(eventData):
+            nonlocal received
+            received += 1
+            if received == EVENT_COUNT:
+                done.set()
+        ws.register_event_callback(on_meters, 'InputVolumeMeters')
+        event_data = {'inputs': [{'inputName': 'Mic {}'.format(i), 'inputLevelsMul': [[0.1, 0.2, 0.3], [0.1, 0.2, 0.3]]} for i in range(8)]}
+        start = time.perf_counter()
+        await ws.call(simpleobsws.Request('Flood', {'eventType': 'InputVolumeMeters', 'eventData': event_data, 'count': EVENT_COUNT}))
+        await asyncio.wait_for(done.wait(), timeout = 60)
+        elapsed = time.perf_counter() - start
+    print('event dispatch: {:.0f} events/s'.format(EVENT_COUNT / elapsed))
+
+async def in_flight_memory():
+    async with ServerProcess(latency = 5) as ws:
+        request = simpleobsws.Request('GetVersion')
+        tracemalloc.start()
+        baseline = tracemalloc.get_traced_memory()[0]
+        tasks = [asyncio.create_task(ws.call(request, timeout = 30)) for i in range(IN_FLIGHT_COUNT)]
+        while len(ws.waiters) < IN_FLIGHT_COUNT:
+            await asyncio.sleep(0.01)
+        in_flight = tracemalloc.get_traced_memory()[0] - baseline
+        tracemalloc.stop()
+        await asyncio.gather(*tasks)
+    print('in-flight requests: {:.0f} bytes per request'.format(in_flight / IN_FLIGHT_COUNT))
+
+BENCHMARKS = {
+    'call_latency': call_latency,
+    'emit_throughput': emit_throughput,
+    'call_batch': call_batch_throughput,
+    'event_dispatch': event_dispatch,
+    'in_flight_memory': in_flight_memory,
+}
+
+async def main(names):
+    for name in names:
+        print('== {}'.format(name))
+        await BENCHMARKS[name]()
+
+if __name__ == '__main__':
+    asyncio.run(main(sys.argv[1:] or list(BENCHMARKS)))
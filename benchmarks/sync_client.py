@@ -0,0 +1,60 @@
+import asyncio
+import multiprocessing
+import os
+import sys
+import threading
+import time
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import simpleobsws
+from suite import PORT, run_server
+
+# Measures blocking call()s per second through one SyncWebSocketClient shared by 1, 8 and 32 caller threads.
+# For comparison, the first row creates an event loop and a connected WebSocketClient for every call, as synchronous code otherwise has to.
+
+THREAD_COUNTS = [1, 8, 32]
+CALLS = 20000
+CONNECT_PER_CALL_CALLS = 200
+
+async def connect_and_call(url, request):
+    ws = simpleobsws.WebSocketClient(url)
+    await ws.connect()
+    await ws.wait_until_identified()
+    await ws.call(request)
+    await ws.disconnect()
+
+def measure_connect_per_call(url, request):
+    start = time.perf_counter()
+    for i in range(CONNECT_PER_CALL_CALLS):
+        asyncio.run(connect_and_call(url, request))
+    return CONNECT_PER_CALL_CALLS / (time.perf_counter() - start)
+
+def measure_threads(ws, request, thread_count):
+    calls_per_thread = CALLS // thread_count
+    def worker():
+        for i in range(calls_per_thread):
+            ws.call(request)
+    threads = [threading.Thread(target = worker) for i in range(thread_count)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return calls_per_thread * thread_count / (time.perf_counter() - start)
+
+def main():
+    ready = multiprocessing.Event()
+    process = multiprocessing.Process(target = run_server, args = (PORT, 0, ready), daemon = True)
+    process.start()
+    ready.wait()
+    url = 'ws://localhost:{}'.format(PORT)
+    request = simpleobsws.Request('GetVersion')
+    print('{:>20} | {:>10}'.format('callers', 'calls/s'))
+    print('{:>20} | {:>10.0f}'.format('connect per call', measure_connect_per_call(url, request)))
+    with simpleobsws.SyncWebSocketClient(url) as ws:
+        ws.connect()
+        for thread_count in THREAD_COUNTS:
+            print('{:>20} | {:>10.0f}'.format('{} threads'.format(thread_count), measure_threads(ws, request, thread_count)))
+    process.terminate()
+
+if __name__ == '__main__':
+    main()
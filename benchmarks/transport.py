@@ -0,0 +1,75 @@
+import asyncio
+import multiprocessing
+import os
+import sys
+import time
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import simpleobsws
+from suite import PORT, run_server
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Compares the transport settings of WebSocketClient against a MockServer running in a child process.
+# Reports the call round-trip time, and the client CPU time per message for sequential calls and for bursts of emits sent in the same loop iteration.
+
+CALL_COUNT = 2000
+BURST_SIZE = 100
+BURST_COUNT = 200
+
+CONFIGS = [
+    ('msgpack', {}),
+    ('msgpack, no deflate', {'compression': False}),
+    ('msgpack, coalesced', {'compression': False, 'coalesce_writes': True}),
+    ('msgpack, nagle', {'compression': False, 'tcp_nodelay': False}),
+    ('json', {'protocol': 'json'}),
+    ('json, no deflate', {'protocol': 'json', 'compression': False}),
+]
+if orjson != None:
+    CONFIGS.append(('orjson, no deflate', {'protocol': 'json', 'json_codec': orjson, 'compression': False}))
+
+async def measure_calls(ws):
+    request = simpleobsws.Request('GetVersion')
+    latencies = []
+    cpu = time.process_time()
+    for i in range(CALL_COUNT):
+        start = time.perf_counter()
+        await ws.call(request)
+        latencies.append(time.perf_counter() - start)
+    cpu = time.process_time() - cpu
+    latencies.sort()
+    return latencies[len(latencies) // 2], latencies[int(len(latencies) * 0.99)], cpu / CALL_COUNT
+
+async def measure_bursts(ws):
+    request = simpleobsws.Request('SetInputVolume', {'inputName': 'Mic', 'inputVolumeDb': -10.0})
+    stats = simpleobsws.Request('GetServerStats')
+    received = (await ws.call(stats)).responseData['requestsReceived']
+    cpu = time.process_time()
+    start = time.perf_counter()
+    for i in range(BURST_COUNT):
+        await asyncio.gather(*[ws.emit(request) for j in range(BURST_SIZE)])
+    while (await ws.call(stats)).responseData['requestsReceived'] <= received + BURST_SIZE * BURST_COUNT:
+        await asyncio.sleep(0.001)
+    elapsed = time.perf_counter() - start
+    cpu = time.process_time() - cpu
+    return BURST_SIZE * BURST_COUNT / elapsed, cpu / (BURST_SIZE * BURST_COUNT)
+
+async def main():
+    ready = multiprocessing.Event()
+    process = multiprocessing.Process(target = run_server, args = (PORT, 0, ready), daemon = True)
+    process.start()
+    await asyncio.get_running_loop().run_in_executor(None, ready.wait)
+    print('{:>20} | {:>12} | {:>12} | {:>12} | {:>12} | {:>12}'.format('settings', 'call p50 us', 'call p99 us', 'cpu/call us', 'burst msg/s', 'cpu/emit us'))
+    for name, kwargs in CONFIGS:
+        ws = simpleobsws.WebSocketClient('ws://localhost:{}'.format(PORT), **kwargs)
+        await ws.connect()
+        await ws.wait_until_identified()
+        p50, p99, call_cpu = await measure_calls(ws)
+        rate, emit_cpu = await measure_bursts(ws)
+        await ws.disconnect()
+        print('{:>20} | {:>12.1f} | {:>12.1f} | {:>12.1f} | {:>12.0f} | {:>12.1f}'.format(name, p50 * 1e6, p99 * 1e6, call_cpu * 1e6, rate, emit_cpu * 1e6))
+    process.terminate()
+
+if __name__ == '__main__':
+    asyncio.run(main())
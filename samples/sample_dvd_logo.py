@@ -81,15 +81,14 @@ async def init():
 
     return True
 
-async def calc_batch():
+def generate_frames():
     global currentXPosition
     global currentYPosition
     global xTransformVelocity
     global yTransformVelocity
 
-    # Generate 180 frame requests (Number can be changed. Smaller is actually generally better.)
-    ret = []
-    for i in range(180):
+    # Generate the requests of one frame at a time, forever. The FrameScheduler takes care of batching them.
+    while True:
         # Apply velocity to the position for the current frame.
         currentXPosition += xTransformVelocity
         currentYPosition += yTransformVelocity
@@ -109,25 +108,17 @@ async def calc_batch():
         sceneItemTransform = {}
         sceneItemTransform['positionX'] = currentXPosition
         sceneItemTransform['positionY'] = currentYPosition
-        ret.append(simpleobsws.Request('SetSceneItemTransform', {'sceneName': dvdStageSceneName, 'sceneItemId': sceneItemId, 'sceneItemTransform': sceneItemTransform}))
-        ret.append(simpleobsws.Request('Sleep', {'sleepFrames': 1}))
-    return ret
+        yield simpleobsws.Request('SetSceneItemTransform', {'sceneName': dvdStageSceneName, 'sceneItemId': sceneItemId, 'sceneItemTransform': sceneItemTransform})
 
 async def update_loop():
     # First, initialize the scene item to the corner of the screen.
     req = simpleobsws.Request('SetSceneItemTransform', {'sceneName': dvdStageSceneName, 'sceneItemId': sceneItemId, 'sceneItemTransform': {'positionX': 0, 'positionY': 0}})
     await ws.call(req)
 
-    # Call a batch, wait for it to finish, then call a new one infinitely.
-    while True:
-        # Generate a new batch of per-frame requests.
-        requests = await calc_batch()
-        # Send it, wait for response
-        responses = await ws.call_batch(requests, halt_on_failure = True, execution_type = simpleobsws.RequestBatchExecutionType.SerialFrame)
-        # Stop sending new requests if they start failing.
-        if len(requests) != len(responses):
-            logging.warning('Received {} responses for {} requests!'.format(len(responses), len(requests)))
-            break
+    # The scheduler sends the frames in SerialFrame request batches, queueing the next batch while the current one executes so there is no stall between batches.
+    scheduler = simpleobsws.FrameScheduler(ws, generate_frames())
+    stats = await scheduler.run()
+    logging.info('Animation stopped. Stats: {}'.format(stats))
 
 loop = asyncio.get_event_loop()
 
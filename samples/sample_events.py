@@ -4,7 +4,7 @@ import asyncio
 import simpleobsws
 
 parameters = simpleobsws.IdentificationParameters() # Create an IdentificationParameters object
-parameters.eventSubscriptions = (1 << 0) | (1 << 2) # Subscribe to the General and Scenes categories
+parameters.eventSubscriptions = simpleobsws.EventSubscription.General | simpleobsws.EventSubscription.Scenes # Subscribe to the General and Scenes categories
 
 ws = simpleobsws.WebSocketClient(url = 'ws://localhost:4444', password = 'test', identification_parameters = parameters) # Every possible argument has been passed, but none are required. See lib code for defaults.
 
@@ -27,4 +27,7 @@ setuptools.setup(
     ],
     python_requires='>=3.9',
     install_requires=requirements,
+    extras_require={
+        'animation': ['numpy'],
+    },
 )
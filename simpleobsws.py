@@ -5,23 +5,97 @@ log = logging.getLogger(__name__)
 import asyncio
 import websockets
 import base64
+import binascii
 import hashlib
+import io
 import json
 import msgpack
 import uuid
 import time
 import inspect
 import enum
+import random
+import collections
+import collections.abc
+import itertools
+import bisect
+import heapq
+import struct
+import socket
+import weakref
+import threading
+import concurrent.futures
 from dataclasses import dataclass, field
 from inspect import signature
+numpy = None # Imported by _require_numpy() on first use, as only animations need it
 
 RPC_VERSION = 1
 
+_TCP_CORK = getattr(socket, 'TCP_CORK', None) # Linux only
+
+# Close codes of obs-websocket after which reconnecting with the same settings cannot succeed
+PERMANENT_CLOSE_CODES = {
+    4009: 'Authentication failed',
+    4010: 'Unsupported RPC version',
+}
+
 class RequestBatchExecutionType(enum.Enum):
     SerialRealtime = 0
     SerialFrame = 1
     Parallel = 2
 
+class EventSubscription(enum.IntFlag):
+    General = 1 << 0
+    Config = 1 << 1
+    Scenes = 1 << 2
+    Inputs = 1 << 3
+    Transitions = 1 << 4
+    Filters = 1 << 5
+    Outputs = 1 << 6
+    SceneItems = 1 << 7
+    MediaInputs = 1 << 8
+    Vendors = 1 << 9
+    Ui = 1 << 10
+    All = General | Config | Scenes | Inputs | Transitions | Filters | Outputs | SceneItems | MediaInputs | Vendors | Ui
+    # High-volume categories, which are not included in All
+    InputVolumeMeters = 1 << 16
+    InputActiveStateChanged = 1 << 17
+    InputShowStateChanged = 1 << 18
+    SceneItemTransformChanged = 1 << 19
+
+# Event subscription category of each event type. Unknown event types are assumed to require EventSubscription.All
+EVENT_SUBSCRIPTIONS = {}
+for _subscription, _event_types in (
+    (EventSubscription.General, ['ExitStarted', 'CustomEvent']),
+    (EventSubscription.Config, ['CurrentSceneCollectionChanging', 'CurrentSceneCollectionChanged', 'SceneCollectionListChanged', 'CurrentProfileChanging', 'CurrentProfileChanged', 'ProfileListChanged']),
+    (EventSubscription.Scenes, ['SceneCreated', 'SceneRemoved', 'SceneNameChanged', 'CurrentProgramSceneChanged', 'CurrentPreviewSceneChanged', 'SceneListChanged']),
+    (EventSubscription.Inputs, ['InputCreated', 'InputRemoved', 'InputNameChanged', 'InputSettingsChanged', 'InputMuteStateChanged', 'InputVolumeChanged', 'InputAudioBalanceChanged', 'InputAudioSyncOffsetChanged', 'InputAudioTracksChanged', 'InputAudioMonitorTypeChanged']),
+    (EventSubscription.Transitions, ['CurrentSceneTransitionChanged', 'CurrentSceneTransitionDurationChanged', 'SceneTransitionStarted', 'SceneTransitionEnded', 'SceneTransitionVideoEnded']),
+    (EventSubscription.Filters, ['SourceFilterListReindexed', 'SourceFilterCreated', 'SourceFilterRemoved', 'SourceFilterNameChanged', 'SourceFilterSettingsChanged', 'SourceFilterEnableStateChanged']),
+    (EventSubscription.Outputs, ['StreamStateChanged', 'RecordStateChanged', 'RecordFileChanged', 'ReplayBufferStateChanged', 'VirtualcamStateChanged', 'ReplayBufferSaved']),
+    (EventSubscription.SceneItems, ['SceneItemCreated', 'SceneItemRemoved', 'SceneItemListReindexed', 'SceneItemEnableStateChanged', 'SceneItemLockStateChanged', 'SceneItemSelected']),
+    (EventSubscription.MediaInputs, ['MediaInputPlaybackStarted', 'MediaInputPlaybackEnded', 'MediaInputActionTriggered']),
+    (EventSubscription.Vendors, ['VendorEvent']),
+    (EventSubscription.Ui, ['StudioModeStateChanged', 'ScreenshotSaved']),
+    (EventSubscription.InputVolumeMeters, ['InputVolumeMeters']),
+    (EventSubscription.InputActiveStateChanged, ['InputActiveStateChanged']),
+    (EventSubscription.InputShowStateChanged, ['InputShowStateChanged']),
+    (EventSubscription.SceneItemTransformChanged, ['SceneItemTransformChanged']),
+):
+    for _event_type in _event_types:
+        EVENT_SUBSCRIPTIONS[_event_type] = _subscription
+
+class LifecycleEvent(enum.Enum):
+    Connected = 0
+    Identified = 1
+    ConnectionLost = 2
+
+class EventStreamPolicy(enum.Enum):
+    DropOldest = 0
+    DropNewest = 1
+    Block = 2
+    Latest = 3
+
 @dataclass
 class IdentificationParameters:
     ignoreNonFatalRequestChecks: bool = None
@@ -52,10 +126,200 @@ class RequestResponse:
     def ok(self):
         return self.requestStatus.result
 
-@dataclass
+class CompactRequest:
+    # Same fields as Request, without a per-instance __dict__. Accepted anywhere a Request is.
+    __slots__ = ('requestType', 'requestData', 'inputVariables', 'outputVariables')
+
+    def __init__(self, requestType: str, requestData: dict = None, inputVariables: dict = None, outputVariables: dict = None):
+        self.requestType = requestType
+        self.requestData = requestData
+        self.inputVariables = inputVariables
+        self.outputVariables = outputVariables
+
+    def __repr__(self):
+        return 'CompactRequest(requestType={!r}, requestData={!r}, inputVariables={!r}, outputVariables={!r})'.format(self.requestType, self.requestData, self.inputVariables, self.outputVariables)
+
+    def __eq__(self, other):
+        if not isinstance(other, (CompactRequest, Request)):
+            return NotImplemented
+        return (self.requestType, self.requestData, self.inputVariables, self.outputVariables) == (other.requestType, other.requestData, other.inputVariables, other.outputVariables)
+
+class CompactRequestStatus:
+    # Same fields as RequestStatus, without a per-instance __dict__
+    __slots__ = ('result', 'code', 'comment')
+
+    def __init__(self, result: bool = False, code: int = 0, comment: str = None):
+        self.result = result
+        self.code = code
+        self.comment = comment
+
+    def __repr__(self):
+        return 'CompactRequestStatus(result={!r}, code={!r}, comment={!r})'.format(self.result, self.code, self.comment)
+
+    def __eq__(self, other):
+        if not isinstance(other, (CompactRequestStatus, RequestStatus)):
+            return NotImplemented
+        return (self.result, self.code, self.comment) == (other.result, other.code, other.comment)
+
+class CompactRequestResponse:
+    # Same fields and methods as RequestResponse, without a per-instance __dict__
+    __slots__ = ('requestType', 'requestStatus', 'responseData')
+
+    def __init__(self, requestType: str = '', requestStatus: CompactRequestStatus = None, responseData: dict = None):
+        self.requestType = requestType
+        self.requestStatus = CompactRequestStatus() if requestStatus is None else requestStatus
+        self.responseData = responseData
+
+    def __repr__(self):
+        return 'CompactRequestResponse(requestType={!r}, requestStatus={!r}, responseData={!r})'.format(self.requestType, self.requestStatus, self.responseData)
+
+    def __eq__(self, other):
+        if not isinstance(other, (CompactRequestResponse, RequestResponse)):
+            return NotImplemented
+        return (self.requestType, self.requestStatus, self.responseData) == (other.requestType, other.requestStatus, other.responseData)
+
+    def has_data(self):
+        return self.responseData != None
+
+    def ok(self):
+        return self.requestStatus.result
+
+def _build_compact_response(result: dict):
+    status = result['requestStatus']
+    return CompactRequestResponse(result['requestType'], CompactRequestStatus(status['result'], status['code'], status.get('comment')), result.get('responseData'))
+
+class BatchResult(collections.abc.Sequence):
+    # Results of call_batch(compact = True). Keeps the decoded results and only builds a CompactRequestResponse when one is accessed.
+    __slots__ = ('results', 'responses')
+
+    def __init__(self, results: list):
+        self.results = results # Decoded results, as sent by obs-websocket
+        self.responses = None # Built responses by index, allocated on first access
+
+    def __len__(self):
+        return len(self.results)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self.results)))]
+        result = self.results[index] # Raises IndexError and normalizes negative indexes below
+        if index < 0:
+            index += len(self.results)
+        if self.responses == None:
+            self.responses = [None] * len(self.results)
+        response = self.responses[index]
+        if response is None: # Not `== None`, which would go through CompactRequestResponse.__eq__()
+            response = self.responses[index] = _build_compact_response(result)
+        return response
+
+    def __iter__(self):
+        if self.responses == None:
+            self.responses = [None] * len(self.results)
+        responses = self.responses
+        for index, result in enumerate(self.results):
+            response = responses[index]
+            if response is None:
+                response = responses[index] = _build_compact_response(result)
+            yield response
+
+    def __repr__(self):
+        return 'BatchResult({} results)'.format(len(self.results))
+
+    def all_ok(self):
+        for result in self.results:
+            if not result['requestStatus']['result']:
+                return False
+        return True
+
+    def failures(self):
+        return [(i, self[i]) for i, result in enumerate(self.results) if not result['requestStatus']['result']]
+
+    def codes(self):
+        return [result['requestStatus']['code'] for result in self.results]
+
 class _ResponseWaiter:
-    event: asyncio.Event = field(default_factory=asyncio.Event)
-    response_data: dict = None
+    __slots__ = ('future', 'request_type', 'entry', 'sent_at', 'received_at', 'raw')
+
+    def __init__(self, request_type: str = None, raw: bool = False):
+        self.future = asyncio.get_running_loop().create_future() # Resolved by the receive task, or failed by _DeadlineQueue / _fail_waiters()
+        self.request_type = request_type
+        self.entry = None # [deadline, counter, waiter] heap entry, while the waiter is in a _DeadlineQueue
+        self.sent_at = None # Only set when metrics are enabled
+        self.received_at = None # Only set when metrics are enabled
+        self.raw = raw # Resolve with the undecoded message
+
+class _DeadlineQueue:
+    # Times out waiters using a single heap and a single timer handle, instead of a wait_for() task and timer per request.
+    # The entries of waiters which complete before their deadline are left in the heap and skipped, until they make up most of it.
+    # Their waiter is cleared from the entry, so that the response held by its future is not kept alive by the heap.
+    __slots__ = ('heap', 'counter', 'stale', 'handle', 'handle_deadline')
+
+    def __init__(self):
+        self.heap = []
+        self.counter = itertools.count() # Tie-breaker, so that entries never compare their waiters
+        self.stale = 0
+        self.handle = None
+        self.handle_deadline = None
+
+    def add(self, waiter: _ResponseWaiter, timeout: float):
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        waiter.entry = [deadline, next(self.counter), waiter]
+        heapq.heappush(self.heap, waiter.entry)
+        if self.handle == None or deadline < self.handle_deadline:
+            self._schedule(loop, deadline)
+
+    def discard(self, waiter: _ResponseWaiter):
+        if waiter.entry == None:
+            return
+        waiter.entry[2] = None
+        waiter.entry = None
+        self.stale += 1
+        if self.stale > 64 and self.stale > len(self.heap) // 2:
+            self.heap = [entry for entry in self.heap if entry[2] != None]
+            heapq.heapify(self.heap)
+            self.stale = 0
+
+    def _schedule(self, loop, deadline: float):
+        if self.handle != None:
+            self.handle.cancel()
+        self.handle = loop.call_at(deadline, self._expire, loop)
+        self.handle_deadline = deadline
+
+    def _expire(self, loop):
+        self.handle = None
+        heap = self.heap
+        now = loop.time()
+        while heap and heap[0][0] <= now:
+            waiter = heapq.heappop(heap)[2]
+            if waiter == None:
+                self.stale -= 1
+                continue
+            waiter.entry = None
+            if not waiter.future.done():
+                waiter.future.set_exception(asyncio.TimeoutError())
+        if heap:
+            self._schedule(loop, heap[0][0])
+
+class _SharedCall:
+    # Each caller waits on its own _ResponseWaiter, so that it can time out through the client's _DeadlineQueue
+    __slots__ = ('task', 'waiters')
+
+    def __init__(self, task):
+        self.task = task
+        self.waiters = []
+        task.add_done_callback(self._resolve)
+
+    def _resolve(self, task):
+        for waiter in self.waiters:
+            if waiter.future.done():
+                continue
+            if task.cancelled():
+                waiter.future.cancel()
+            elif task.exception() != None:
+                waiter.future.set_exception(task.exception())
+            else:
+                waiter.future.set_result(task.result())
 
 class MessageTimeout(Exception):
     pass
@@ -63,30 +327,773 @@ class EventRegistrationError(Exception):
     pass
 class NotIdentifiedError(Exception):
     pass
+class MirrorSyncError(Exception):
+    pass
+class FrameSchedulerError(Exception):
+    pass
+class ConnectionLostError(Exception):
+    pass
+
+def _json_default(obj):
+    if isinstance(obj, (bytes, bytearray, memoryview)):
+        return '<{} bytes>'.format(len(obj))
+    return repr(obj)
+
+class _LoggedPayload:
+    # Defers serialization of a payload until the log record is actually formatted
+    __slots__ = ('payload', 'limit')
+
+    def __init__(self, payload, limit):
+        self.payload = payload
+        self.limit = limit
+
+    def __str__(self):
+        text = json.dumps(self.payload, indent=2, default=_json_default)
+        if self.limit and len(text) > self.limit:
+            return '{}... ({} characters truncated)'.format(text[:self.limit], len(text) - self.limit)
+        return text
+
+def _request_key(request: Request):
+    if not request.requestData:
+        return (request.requestType, '')
+    return (request.requestType, json.dumps(request.requestData, sort_keys=True, separators=(',', ':'), default=_json_default))
+
+# Maps an event type to the cached request types it makes stale.
+# Each rule is (requestType, requestData field, eventData field). If the field is None, or the cached request does not
+# specify the field, every cached response of that request type is invalidated.
+CACHE_INVALIDATION_RULES = {
+    'CurrentSceneCollectionChanged': None, # None invalidates the entire cache
+    'CurrentProfileChanged': None,
+    'SceneCreated': [('GetSceneList', None, None), ('GetGroupList', None, None)],
+    'SceneRemoved': [('GetSceneList', None, None), ('GetGroupList', None, None), ('GetSceneItemList', 'sceneName', 'sceneName'), ('GetGroupSceneItemList', 'sceneName', 'sceneName')],
+    'SceneNameChanged': [('GetSceneList', None, None), ('GetGroupList', None, None), ('GetSceneItemList', 'sceneName', 'oldSceneName'), ('GetGroupSceneItemList', 'sceneName', 'oldSceneName')],
+    'SceneListChanged': [('GetSceneList', None, None)],
+    'CurrentProgramSceneChanged': [('GetSceneList', None, None), ('GetCurrentProgramScene', None, None)],
+    'CurrentPreviewSceneChanged': [('GetSceneList', None, None), ('GetCurrentPreviewScene', None, None)],
+    'InputCreated': [('GetInputList', None, None)],
+    'InputRemoved': [('GetInputList', None, None), ('GetInputSettings', 'inputName', 'inputName'), ('GetSceneItemList', None, None), ('GetGroupSceneItemList', None, None)],
+    'InputNameChanged': [('GetInputList', None, None), ('GetInputSettings', 'inputName', 'oldInputName'), ('GetSceneItemList', None, None), ('GetGroupSceneItemList', None, None)],
+    'InputSettingsChanged': [('GetInputSettings', 'inputName', 'inputName')],
+    'InputMuteStateChanged': [('GetInputMute', 'inputName', 'inputName')],
+    'InputVolumeChanged': [('GetInputVolume', 'inputName', 'inputName')],
+    'SceneItemCreated': [('GetSceneItemList', 'sceneName', 'sceneName'), ('GetGroupSceneItemList', 'sceneName', 'sceneName')],
+    'SceneItemRemoved': [('GetSceneItemList', 'sceneName', 'sceneName'), ('GetGroupSceneItemList', 'sceneName', 'sceneName')],
+    'SceneItemListReindexed': [('GetSceneItemList', 'sceneName', 'sceneName'), ('GetGroupSceneItemList', 'sceneName', 'sceneName')],
+    'SceneItemEnableStateChanged': [('GetSceneItemList', 'sceneName', 'sceneName'), ('GetGroupSceneItemList', 'sceneName', 'sceneName')],
+    'SceneItemLockStateChanged': [('GetSceneItemList', 'sceneName', 'sceneName'), ('GetGroupSceneItemList', 'sceneName', 'sceneName')],
+    'SourceFilterCreated': [('GetSourceFilterList', 'sourceName', 'sourceName')],
+    'SourceFilterRemoved': [('GetSourceFilterList', 'sourceName', 'sourceName'), ('GetSourceFilter', 'sourceName', 'sourceName')],
+    'SourceFilterNameChanged': [('GetSourceFilterList', 'sourceName', 'sourceName'), ('GetSourceFilter', 'sourceName', 'sourceName')],
+    'SourceFilterListReindexed': [('GetSourceFilterList', 'sourceName', 'sourceName')],
+    'SourceFilterEnableStateChanged': [('GetSourceFilterList', 'sourceName', 'sourceName'), ('GetSourceFilter', 'sourceName', 'sourceName')],
+    'SourceFilterSettingsChanged': [('GetSourceFilterList', 'sourceName', 'sourceName'), ('GetSourceFilter', 'sourceName', 'sourceName')],
+}
+
+# Opt-in rules for scene item transforms. SceneItemTransformChanged is a high-volume event category, which is not part of
+# EventSubscription.All, so these are not included in CACHE_INVALIDATION_RULES. Without them, the transforms in cached
+# GetSceneItemList/GetGroupSceneItemList responses are not kept up to date.
+SCENE_ITEM_TRANSFORM_INVALIDATION_RULES = {
+    'SceneItemRemoved': [('GetSceneItemTransform', 'sceneName', 'sceneName')],
+    'SceneItemTransformChanged': [('GetSceneItemList', 'sceneName', 'sceneName'), ('GetGroupSceneItemList', 'sceneName', 'sceneName'), ('GetSceneItemTransform', 'sceneName', 'sceneName')],
+}
+
+# Read-only requests which are safe to deduplicate or repeat
+IDEMPOTENT_REQUEST_TYPES = frozenset([
+    'GetVersion', 'GetStats', 'GetHotkeyList', 'GetPersistentData', 'GetSceneCollectionList', 'GetProfileList', 'GetProfileParameter',
+    'GetVideoSettings', 'GetStreamServiceSettings', 'GetRecordDirectory', 'GetSourceActive', 'GetSourceScreenshot',
+    'GetSceneList', 'GetGroupList', 'GetCurrentProgramScene', 'GetCurrentPreviewScene', 'GetSceneSceneTransitionOverride',
+    'GetInputList', 'GetInputKindList', 'GetSpecialInputs', 'GetInputDefaultSettings', 'GetInputSettings', 'GetInputMute',
+    'GetInputVolume', 'GetInputAudioBalance', 'GetInputAudioSyncOffset', 'GetInputAudioMonitorType', 'GetInputAudioTracks',
+    'GetInputPropertiesListPropertyItems', 'GetTransitionKindList', 'GetSceneTransitionList', 'GetCurrentSceneTransition',
+    'GetCurrentSceneTransitionCursor', 'GetSourceFilterKindList', 'GetSourceFilterList', 'GetSourceFilterDefaultSettings',
+    'GetSourceFilter', 'GetSceneItemList', 'GetGroupSceneItemList', 'GetSceneItemId', 'GetSceneItemSource',
+    'GetSceneItemTransform', 'GetSceneItemEnabled', 'GetSceneItemLocked', 'GetSceneItemIndex', 'GetSceneItemBlendMode',
+    'GetVirtualCamStatus', 'GetReplayBufferStatus', 'GetLastReplayBufferReplay', 'GetOutputList', 'GetOutputStatus',
+    'GetOutputSettings', 'GetStreamStatus', 'GetRecordStatus', 'GetMediaInputStatus', 'GetStudioModeEnabled', 'GetMonitorList'
+])
+
+class ResponseCache:
+    def __init__(self, max_entries: int = 256, ttl: float = None, ttls: dict = None, request_types: set = None, invalidation_rules: dict = None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.ttls = ttls or {}
+        self.invalidation_rules = invalidation_rules if invalidation_rules != None else CACHE_INVALIDATION_RULES
+        if request_types == None:
+            request_types = set()
+            for rules in self.invalidation_rules.values():
+                for request_type, request_field, event_field in rules or ():
+                    request_types.add(request_type)
+        self.request_types = frozenset(request_types)
+        # Event subscriptions needed for the cached responses of each request type to be invalidated
+        self.global_subscriptions = 0
+        self.required_subscriptions = {}
+        for event_type, rules in self.invalidation_rules.items():
+            subscription = int(EVENT_SUBSCRIPTIONS.get(event_type, EventSubscription.All))
+            if rules == None:
+                self.global_subscriptions |= subscription
+                continue
+            for request_type, request_field, event_field in rules:
+                self.required_subscriptions[request_type] = self.required_subscriptions.get(request_type, 0) | subscription
+        for request_type in self.required_subscriptions:
+            self.required_subscriptions[request_type] |= self.global_subscriptions
+
+        self.entries = collections.OrderedDict() # key -> (expiry, requestData, RequestResponse), in least recently used order
+        self.type_keys = {} # requestType -> set of keys
+        self.generations = {} # requestType -> invalidation counter, used to discard responses which raced with an invalidation
+        self.global_generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def cacheable(self, request_type: str, event_subscriptions: int):
+        # Without the events invalidating a request type, its responses are only cached when they expire
+        if request_type not in self.request_types:
+            return False
+        if self.ttls.get(request_type, self.ttl) != None:
+            return True
+        required = self.required_subscriptions.get(request_type, self.global_subscriptions)
+        return event_subscriptions & required == required
+
+    def get(self, key):
+        entry = self.entries.get(key)
+        if entry == None:
+            self.misses += 1
+            return None
+        expiry, request_data, response = entry
+        if expiry != None and expiry < time.monotonic():
+            self._remove(key)
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return response
+
+    def generation(self, request_type: str):
+        return (self.global_generation, self.generations.get(request_type, 0))
+
+    def put(self, key, request: Request, response: RequestResponse, generation = None):
+        if generation != None and generation != self.generation(request.requestType):
+            return # An event invalidated this request type while the request was in flight
+        ttl = self.ttls.get(request.requestType, self.ttl)
+        expiry = time.monotonic() + ttl if ttl != None else None
+        self.entries[key] = (expiry, request.requestData, response)
+        self.entries.move_to_end(key)
+        self.type_keys.setdefault(request.requestType, set()).add(key)
+        while len(self.entries) > self.max_entries:
+            self._remove(next(iter(self.entries)))
+            self.evictions += 1
+
+    def invalidate(self, request_type: str = None, request_field: str = None, value = None):
+        if request_type == None:
+            self.invalidations += len(self.entries)
+            self.clear()
+            self.global_generation += 1
+            return
+        self.generations[request_type] = self.generations.get(request_type, 0) + 1
+        for key in list(self.type_keys.get(request_type, ())):
+            request_data = self.entries[key][1]
+            if request_field != None and request_data and request_field in request_data and request_data[request_field] != value:
+                continue
+            self._remove(key)
+            self.invalidations += 1
+
+    def invalidate_event(self, event_type: str, event_data: dict):
+        if event_type not in self.invalidation_rules:
+            return
+        rules = self.invalidation_rules[event_type]
+        if rules == None:
+            self.invalidate()
+            return
+        for request_type, request_field, event_field in rules:
+            if request_field != None and event_data and event_field in event_data:
+                self.invalidate(request_type, request_field, event_data[event_field])
+            else:
+                self.invalidate(request_type)
+
+    def clear(self):
+        self.entries.clear()
+        self.type_keys.clear()
+
+    def stats(self):
+        return {'entries': len(self.entries), 'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions, 'invalidations': self.invalidations}
+
+    def _remove(self, key):
+        del self.entries[key]
+        keys = self.type_keys[key[0]]
+        keys.discard(key)
+        if not keys:
+            del self.type_keys[key[0]]
+
+class TemplateField:
+    __slots__ = ('name',)
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __repr__(self):
+        return 'TemplateField({!r})'.format(self.name)
+
+_REQUEST_ID_FIELD = TemplateField('requestId')
+
+class RequestTemplate:
+    # A request whose constant parts are encoded once. Encoding only packs the TemplateField values and joins the chunks.
+    def __init__(self, requestType: str, requestData: dict = None):
+        self.requestType = requestType
+        self.requestData = requestData
+        self.payload = {'op': 6, 'd': {'requestType': requestType, 'requestId': _REQUEST_ID_FIELD}}
+        if requestData != None:
+            self.payload['d']['requestData'] = requestData
+        self.chunks = [] # Encoded constant parts, with None in place of the fields
+        self.fields = [] # (index in chunks, field name)
+        self._compile(self.payload)
+
+    def encode(self, request_id: str, values: dict = None, pack = msgpack.packb):
+        chunks = self.chunks.copy()
+        for index, name in self.fields:
+            chunks[index] = pack(request_id if name is None else values[name])
+        return b''.join(chunks)
+
+    def build(self, request_id: str, values: dict = None):
+        return self._substitute(self.payload, request_id, values or {})
+
+    def _compile(self, obj):
+        if isinstance(obj, TemplateField):
+            self.fields.append((len(self.chunks), None if obj is _REQUEST_ID_FIELD else obj.name))
+            self.chunks.append(None)
+            return
+        if isinstance(obj, dict):
+            self._append_constant(msgpack.Packer().pack_map_header(len(obj)))
+            for key, value in obj.items():
+                self._append_constant(msgpack.packb(key))
+                self._compile(value)
+        elif isinstance(obj, (list, tuple)):
+            self._append_constant(msgpack.Packer().pack_array_header(len(obj)))
+            for value in obj:
+                self._compile(value)
+        else:
+            self._append_constant(msgpack.packb(obj))
+
+    def _append_constant(self, data: bytes):
+        if self.chunks and self.chunks[-1] != None:
+            self.chunks[-1] += data
+        else:
+            self.chunks.append(data)
+
+    def _substitute(self, obj, request_id, values):
+        if isinstance(obj, TemplateField):
+            return request_id if obj is _REQUEST_ID_FIELD else values[obj.name]
+        if isinstance(obj, dict):
+            return {key: self._substitute(value, request_id, values) for key, value in obj.items()}
+        if isinstance(obj, (list, tuple)):
+            return [self._substitute(value, request_id, values) for value in obj]
+        return obj
+
+def _dump_json(payload):
+    return json.dumps(payload, separators = (',', ':'), ensure_ascii = False)
+
+def _peek_message(message: bytes, unpacker = None):
+    # Reads only `d.requestId` and `d.eventType` of an encoded message, skipping over everything else without building objects.
+    # obs-websocket sorts keys, so `requestId` is found before `responseData`/`results` are reached.
+    # `unpacker` is an empty feeding Unpacker to reuse, as creating one costs more than decoding a small message.
+    if len(message) > 65536:
+        return _read_message_ids(msgpack.Unpacker(io.BytesIO(message), read_size = 4096)) # Avoids copying the whole message into the unpacker
+    if unpacker == None:
+        unpacker = msgpack.Unpacker()
+    unpacker.feed(message)
+    start = unpacker.tell()
+    try:
+        return _read_message_ids(unpacker)
+    finally:
+        unpacker.read_bytes(len(message) - (unpacker.tell() - start)) # Leaves the unpacker empty for the next message
+
+def _read_message_ids(unpacker):
+    for i in range(unpacker.read_map_header()):
+        if unpacker.unpack() != 'd':
+            unpacker.skip()
+            continue
+        for j in range(unpacker.read_map_header()):
+            key = unpacker.unpack()
+            if key == 'requestId':
+                return unpacker.unpack(), None
+            elif key == 'eventType':
+                return None, unpacker.unpack()
+            unpacker.skip()
+        break
+    return None, None
+
+def _event_type_key(payload):
+    return payload['eventType']
+
+class EventStream:
+    def __init__(self, client, types = None, maxsize: int = 1024, policy: EventStreamPolicy = EventStreamPolicy.DropOldest, key = None):
+        self.client = client
+        self.types = frozenset(types) if types else None
+        self.maxsize = maxsize
+        self.policy = policy
+        self.key = key or _event_type_key
+
+        self.queue = collections.OrderedDict() if policy == EventStreamPolicy.Latest else collections.deque()
+        self.getters = collections.deque() # One future per consumer waiting in __anext__()
+        self.putters = collections.deque()
+        self.closed = False
+        self.delivered = 0
+        self.dropped = 0
+        self.coalesced = 0
+        self.high_water = 0
+
+    def qsize(self):
+        return len(self.queue)
+
+    def stats(self):
+        return {'depth': len(self.queue), 'maxsize': self.maxsize, 'high_water': self.high_water, 'delivered': self.delivered, 'dropped': self.dropped, 'coalesced': self.coalesced}
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        if self.client != None:
+            self.client._remove_event_stream(self)
+        while self.getters:
+            getter = self.getters.popleft()
+            if not getter.done():
+                getter.set_result(None)
+        while self.putters:
+            putter = self.putters.popleft()
+            if not putter.done():
+                putter.set_result(None)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        while not self.queue:
+            if self.closed:
+                raise StopAsyncIteration
+            getter = asyncio.get_running_loop().create_future()
+            self.getters.append(getter)
+            try:
+                await getter
+            except:
+                getter.cancel()
+                try:
+                    self.getters.remove(getter)
+                except ValueError:
+                    pass
+                if self.queue and not getter.cancelled():
+                    self._wake_getter() # This consumer was woken for an item it will not take, pass it on
+                raise
+        if self.policy == EventStreamPolicy.Latest:
+            item = self.queue.popitem(last = False)[1]
+        else:
+            item = self.queue.popleft()
+        self.delivered += 1
+        while self.putters:
+            putter = self.putters.popleft()
+            if not putter.done():
+                putter.set_result(None)
+                break
+        return item
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self.close()
+
+    def _offer(self, item):
+        if self.closed:
+            return
+        queue = self.queue
+        if self.policy == EventStreamPolicy.Latest:
+            try:
+                key = self.key(item)
+            except Exception:
+                # Runs in the receive task, which must not die because of a key function which does not fit every event
+                log.exception('The key function of an event stream raised an exception. Dropping the event:\n')
+                self.dropped += 1
+                return
+            if key in queue:
+                queue[key] = item # Keeps the position of the key, so that other keys are not starved
+                self.coalesced += 1
+                return
+            if len(queue) >= self.maxsize:
+                queue.popitem(last = False)
+                self.dropped += 1
+            queue[key] = item
+        elif len(queue) >= self.maxsize:
+            self.dropped += 1
+            if self.policy == EventStreamPolicy.DropNewest:
+                return
+            queue.popleft()
+            queue.append(item)
+        else:
+            queue.append(item)
+        if len(queue) > self.high_water:
+            self.high_water = len(queue)
+        self._wake_getter()
+
+    async def _put(self, item):
+        while len(self.queue) >= self.maxsize and not self.closed:
+            putter = asyncio.get_running_loop().create_future()
+            self.putters.append(putter)
+            await putter
+        if self.closed:
+            return
+        self.queue.append(item)
+        if len(self.queue) > self.high_water:
+            self.high_water = len(self.queue)
+        self._wake_getter()
+
+    def _wake_getter(self):
+        while self.getters:
+            getter = self.getters.popleft()
+            if not getter.done():
+                getter.set_result(None)
+                return
 
 async def _wait_for_cond(cond, func):
     async with cond:
         await cond.wait_for(func)
 
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+class _Histogram:
+    __slots__ = ('bounds', 'counts', 'count', 'sum', 'max')
+
+    def __init__(self, bounds: tuple):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+        if value > self.max:
+            self.max = value
+
+    def snapshot(self):
+        buckets = []
+        total = 0
+        for bound, count in zip(self.bounds + (float('inf'),), self.counts):
+            total += count
+            buckets.append((bound, total))
+        return {'count': self.count, 'sum': self.sum, 'max': self.max, 'buckets': buckets}
+
+class ClientMetrics:
+    def __init__(self, buckets: tuple = LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.clients = weakref.WeakSet()
+        self.reset()
+
+    def reset(self):
+        self.started = time.monotonic()
+        self.latency = {}
+        self.responses = collections.Counter()
+        self.errors = collections.Counter()
+        self.timeouts = collections.Counter()
+        self.connection_lost = collections.Counter()
+        self.phases = {phase: _Histogram(self.buckets) for phase in ('encode', 'send', 'decode', 'schedule')}
+        self.frames_in = collections.Counter()
+        self.bytes_in = collections.Counter()
+        self.frames_out = collections.Counter()
+        self.bytes_out = collections.Counter()
+        self.discarded_frames = 0
+        self.discarded_bytes = 0
+        self.events = collections.Counter()
+        self.callbacks = {}
+
+    def snapshot(self):
+        elapsed = time.monotonic() - self.started
+        in_flight = collections.Counter()
+        for client in list(self.clients):
+            for waiter in list(client.waiters.values()):
+                in_flight[waiter.request_type] += 1
+        requests = {}
+        for request_type in set(self.responses) | set(self.errors) | set(self.timeouts) | set(self.connection_lost):
+            latency = self.latency.get(request_type)
+            requests[request_type] = {
+                'count': self.responses[request_type],
+                'errors': self.errors[request_type],
+                'timeouts': self.timeouts[request_type],
+                'connection_lost': self.connection_lost[request_type],
+                'latency': latency.snapshot() if latency != None else None
+            }
+        return {
+            'elapsed': elapsed,
+            'in_flight': dict(in_flight),
+            'requests': requests,
+            'phases': {phase: histogram.snapshot() for phase, histogram in self.phases.items()},
+            'frames_in': dict(self.frames_in),
+            'bytes_in': dict(self.bytes_in),
+            'frames_out': dict(self.frames_out),
+            'bytes_out': dict(self.bytes_out),
+            'discarded_frames': self.discarded_frames,
+            'discarded_bytes': self.discarded_bytes,
+            'events': {event_type: {'count': count, 'rate': count / elapsed if elapsed > 0 else 0.0} for event_type, count in self.events.items()},
+            'callbacks': {name: histogram.snapshot() for name, histogram in self.callbacks.items()}
+        }
+
+    def export(self, exporter = None):
+        if exporter == None:
+            exporter = format_prometheus
+        return exporter(self.snapshot())
+
+    def _histogram(self, histograms: dict, key: str):
+        histogram = histograms.get(key)
+        if histogram == None:
+            histogram = histograms[key] = _Histogram(self.buckets)
+        return histogram
+
+    def _record_send(self, op_code: int, size: int, encode_seconds: float, send_seconds: float):
+        self.frames_out[op_code] += 1
+        self.bytes_out[op_code] += size
+        self.phases['encode'].observe(encode_seconds)
+        self.phases['send'].observe(send_seconds)
+
+    def _record_receive(self, op_code: int, size: int, decode_seconds: float):
+        self.frames_in[op_code] += 1
+        self.bytes_in[op_code] += size
+        self.phases['decode'].observe(decode_seconds)
+
+    def _record_discard(self, size: int, event_type: str = None):
+        self.discarded_frames += 1
+        self.discarded_bytes += size
+        if event_type != None:
+            self.events[event_type] += 1
+
+    def _record_response(self, request_type: str, latency: float, results: list):
+        self.responses[request_type] += 1
+        if latency != None:
+            self._histogram(self.latency, request_type).observe(latency)
+        for result in results:
+            if not result['requestStatus']['result']:
+                self.errors[result.get('requestType', request_type)] += 1
+
+    def _record_completion(self, waiter: _ResponseWaiter):
+        future = waiter.future
+        if not future.cancelled() and isinstance(future.exception(), ConnectionLostError):
+            self.connection_lost[waiter.request_type] += 1
+        elif waiter.received_at == None:
+            self.timeouts[waiter.request_type] += 1 # Timed out or cancelled before the response arrived
+        else:
+            self.phases['schedule'].observe(time.perf_counter() - waiter.received_at)
+
+    async def _time_callback(self, callback, coroutine):
+        start = time.perf_counter()
+        try:
+            await coroutine
+        finally:
+            self._histogram(self.callbacks, callback.__qualname__).observe(time.perf_counter() - start)
+
+def _prometheus_labels(**labels):
+    escaped = ('{}="{}"'.format(name, str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')) for name, value in labels.items())
+    return '{' + ','.join(escaped) + '}' if labels else ''
+
+def _prometheus_histogram(lines: list, name: str, histogram: dict, **labels):
+    for bound, count in histogram['buckets']:
+        lines.append('{}_bucket{} {}'.format(name, _prometheus_labels(**labels, le = '+Inf' if bound == float('inf') else repr(float(bound))), count))
+    lines.append('{}_sum{} {}'.format(name, _prometheus_labels(**labels), repr(histogram['sum'])))
+    lines.append('{}_count{} {}'.format(name, _prometheus_labels(**labels), histogram['count']))
+
+def format_prometheus(snapshot: dict, prefix: str = 'simpleobsws'):
+    lines = []
+    def metric(name, metric_type, samples):
+        lines.append('# TYPE {}_{} {}'.format(prefix, name, metric_type))
+        for labels, value in samples:
+            lines.append('{}_{}{} {}'.format(prefix, name, _prometheus_labels(**labels), value))
+    requests = snapshot['requests']
+    metric('requests_total', 'counter', [({'request_type': t}, r['count']) for t, r in requests.items()])
+    metric('request_errors_total', 'counter', [({'request_type': t}, r['errors']) for t, r in requests.items()])
+    metric('request_timeouts_total', 'counter', [({'request_type': t}, r['timeouts']) for t, r in requests.items()])
+    metric('request_connection_lost_total', 'counter', [({'request_type': t}, r['connection_lost']) for t, r in requests.items()])
+    metric('requests_in_flight', 'gauge', [({'request_type': t}, count) for t, count in snapshot['in_flight'].items()])
+    lines.append('# TYPE {}_request_latency_seconds histogram'.format(prefix))
+    for request_type, request in requests.items():
+        if request['latency'] != None:
+            _prometheus_histogram(lines, prefix + '_request_latency_seconds', request['latency'], request_type = request_type)
+    lines.append('# TYPE {}_phase_seconds histogram'.format(prefix))
+    for phase, histogram in snapshot['phases'].items():
+        _prometheus_histogram(lines, prefix + '_phase_seconds', histogram, phase = phase)
+    metric('frames_total', 'counter', [({'direction': 'in', 'op': op}, count) for op, count in snapshot['frames_in'].items()] + [({'direction': 'out', 'op': op}, count) for op, count in snapshot['frames_out'].items()])
+    metric('bytes_total', 'counter', [({'direction': 'in', 'op': op}, count) for op, count in snapshot['bytes_in'].items()] + [({'direction': 'out', 'op': op}, count) for op, count in snapshot['bytes_out'].items()])
+    metric('discarded_frames_total', 'counter', [({}, snapshot['discarded_frames'])])
+    metric('discarded_bytes_total', 'counter', [({}, snapshot['discarded_bytes'])])
+    metric('events_total', 'counter', [({'event_type': t}, event['count']) for t, event in snapshot['events'].items()])
+    lines.append('# TYPE {}_callback_seconds histogram'.format(prefix))
+    for name, histogram in snapshot['callbacks'].items():
+        _prometheus_histogram(lines, prefix + '_callback_seconds', histogram, callback = name)
+    return '\n'.join(lines) + '\n'
+
+SESSION_LOG_MAGIC = b'SOWSLOG1'
+_SESSION_LOG_RECORD = struct.Struct('<BQI') # Flags, time.monotonic_ns() and length of each frame
+
+@dataclass
+class RecordedFrame:
+    inbound: bool
+    timestamp: int # time.monotonic_ns() when the frame was sent or received
+    data: bytes # str for text (json) frames
+
+    def decode(self):
+        if type(self.data) == str:
+            return json.loads(self.data)
+        return msgpack.unpackb(self.data)
+
+class SessionRecorder:
+    INBOUND = 1 << 0
+    TEXT = 1 << 1
+
+    def __init__(self, path: str, buffer_size: int = 1 << 20):
+        self.path = path
+        self.file = open(path, 'ab', buffering = buffer_size)
+        if self.file.tell() == 0:
+            self.file.write(SESSION_LOG_MAGIC)
+        self.frames = 0
+        self.bytes = 0
+
+    def record(self, message, inbound: bool):
+        if self.file == None:
+            return
+        flags = self.INBOUND if inbound else 0
+        if type(message) == str:
+            message = message.encode('utf-8')
+            flags |= self.TEXT
+        self.file.write(_SESSION_LOG_RECORD.pack(flags, time.monotonic_ns(), len(message)))
+        self.file.write(message)
+        self.frames += 1
+        self.bytes += len(message)
+
+    def flush(self):
+        if self.file != None:
+            self.file.flush()
+
+    def close(self):
+        if self.file != None:
+            self.file.close()
+            self.file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+def read_session_log(path: str):
+    with open(path, 'rb') as f:
+        if f.read(len(SESSION_LOG_MAGIC)) != SESSION_LOG_MAGIC:
+            raise ValueError('{} is not a session log.'.format(path))
+        while True:
+            header = f.read(_SESSION_LOG_RECORD.size)
+            if len(header) < _SESSION_LOG_RECORD.size:
+                return
+            flags, timestamp, length = _SESSION_LOG_RECORD.unpack(header)
+            data = f.read(length)
+            if len(data) < length:
+                return # Truncated by a crash while recording
+            if flags & SessionRecorder.TEXT:
+                data = data.decode('utf-8')
+            yield RecordedFrame(bool(flags & SessionRecorder.INBOUND), timestamp, data)
+
 class WebSocketClient:
     def __init__(self,
         url: str = "ws://localhost:4444",
         password: str = '',
-        identification_parameters: IdentificationParameters = IdentificationParameters()
+        identification_parameters: IdentificationParameters = IdentificationParameters(),
+        log_payload_limit: int = 4096,
+        trace_hook = None,
+        auto_batch: bool = False,
+        auto_batch_window: float = 0,
+        auto_batch_max: int = 64,
+        response_cache: ResponseCache = None,
+        single_flight_types: set = None,
+        auto_event_subscriptions: bool = False,
+        auto_reconnect: bool = False,
+        reconnect_delay: float = 0.5,
+        reconnect_max_delay: float = 30,
+        replay_requests: bool = False,
+        lazy_decode_threshold: int = 512,
+        metrics: ClientMetrics = None,
+        recorder: SessionRecorder = None,
+        protocol: str = 'msgpack',
+        json_codec = None,
+        compression: bool = True,
+        max_size: int = 2**24,
+        write_limit: int = 2**15,
+        tcp_nodelay: bool = True,
+        coalesce_writes: bool = False
     ):
         self.url = url
         self.password = password
         self.identification_parameters = identification_parameters
+        self.log_payload_limit = log_payload_limit
+        self.trace_hook = trace_hook
+        self.auto_batch = auto_batch
+        self.auto_batch_window = auto_batch_window
+        self.auto_batch_max = auto_batch_max
+        self.response_cache = response_cache
+        self.single_flight_types = frozenset(single_flight_types or ())
+        self.auto_event_subscriptions = auto_event_subscriptions
+        self.auto_reconnect = auto_reconnect
+        self.reconnect_delay = reconnect_delay
+        self.reconnect_max_delay = reconnect_max_delay
+        self.next_reconnect_delay = reconnect_delay # Grows with every attempt, until the session is identified again
+        self.close_code = None # Of the last connection lost
+        self.close_reason = None
+        self.replay_requests = replay_requests
+        self.lazy_decode_threshold = lazy_decode_threshold
+        self.metrics = metrics
+        if metrics != None:
+            metrics.clients.add(self)
+        self.recorder = recorder
+        if protocol not in ('msgpack', 'json'):
+            raise ValueError('Unknown protocol `{}`. Use `msgpack` or `json`.'.format(protocol))
+        self.protocol = protocol
+        self.json_codec = json_codec
+        self.compression = compression
+        self.max_size = max_size
+        self.write_limit = write_limit
+        self.tcp_nodelay = tcp_nodelay
+        self.coalesce_writes = coalesce_writes
 
         self.http_headers = {}
         self.ws = None
         self.ws_open = False
         self.waiters = {}
+        self.deadlines = _DeadlineQueue()
+        self.raw_waiters = 0
+        self.peek_unpacker = msgpack.Unpacker()
         self.identified = False
         self.recv_task = None
         self.hello_message = None
         self.event_callbacks = []
+        self.event_callback_index = {}
+        self.catchall_callbacks = ()
         self.cond = asyncio.Condition()
+        self.auto_batch_pending = []
+        self.auto_batch_handle = None
+        self.shared_calls = {}
+        self.lifecycle_callbacks = ()
+        self.closing = False
+        self.reconnect_task = None
+        self.request_id_prefix = uuid.uuid4().hex[:12] + '-' # Keeps IDs unique across clients and sessions
+        self.request_id_counter = itertools.count()
+        self.packer = msgpack.Packer() # Reused, as msgpack.packb() allocates a new 256 KiB buffer on every call
+        if protocol == 'json':
+            self.encode = json_codec.dumps if json_codec != None else _dump_json
+            self.text_frames = True # Also sends the bytes returned by codecs like orjson as text frames
+        else:
+            self.encode = self.packer.pack
+            self.text_frames = None
+        self.json_loads = json_codec.loads if json_codec != None else json.loads
+        self.ws_socket = None
+        self.corked = False
+        self.event_streams = ()
+        self.catchall_consumers = False # Set while every event is decoded anyway, for a catch-all callback or stream
+        self.event_subscriptions = None # Subscriptions last sent to obs-websocket when auto_event_subscriptions is enabled
+        self.reidentify_task = None
 
     # Todo: remove bool return, raise error if already open
     async def connect(self):
@@ -94,13 +1101,44 @@ class WebSocketClient:
             log.debug('WebSocket session is already open. Returning early.')
             return False
         self.answers = {}
+        self.closing = False
+        await self._open_connection()
+        return True
+
+    async def _open_connection(self):
         self.recv_task = None
         self.identified = False
         self.hello_message = None
-        self.ws = await websockets.connect(self.url, subprotocols = ['obswebsocket.msgpack'], additional_headers = self.http_headers, max_size=2**24)
+        if self.response_cache != None:
+            self.response_cache.invalidate()
+        self.ws = await websockets.connect(self.url,
+            subprotocols = ['obswebsocket.' + self.protocol],
+            additional_headers = self.http_headers,
+            compression = 'deflate' if self.compression else None,
+            max_size = self.max_size,
+            write_limit = self.write_limit
+        )
         self.ws_open = True
+        sock = self.ws.transport.get_extra_info('socket')
+        if sock != None and sock.family in (socket.AF_INET, socket.AF_INET6):
+            self.ws_socket = sock
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, int(self.tcp_nodelay)) # asyncio enables it by default
+        else:
+            self.ws_socket = None
         self.recv_task = asyncio.create_task(self._ws_recv_task())
-        return True
+        self._dispatch_lifecycle_event(LifecycleEvent.Connected)
+
+    async def _reconnect(self):
+        while not self.closing:
+            # The backoff is kept across connections which are lost again before being identified, like after an authentication failure
+            delay = self.next_reconnect_delay
+            self.next_reconnect_delay = min(delay * 2, self.reconnect_max_delay)
+            await asyncio.sleep(delay * random.uniform(0.5, 1.0))
+            try:
+                await self._open_connection()
+                return
+            except (OSError, asyncio.TimeoutError, websockets.exceptions.WebSocketException) as e:
+                log.debug('Failed to reconnect to obs-websocket: {}'.format(e))
 
     async def wait_until_identified(self, timeout: int = 10):
         if not self.ws_open:
@@ -114,10 +1152,15 @@ class WebSocketClient:
 
     # Todo: remove bool return, raise error if already closed
     async def disconnect(self):
+        self.closing = True
+        if self.reconnect_task != None:
+            self.reconnect_task.cancel()
+            self.reconnect_task = None
         if self.recv_task == None:
             log.debug('WebSocket session is not open. Returning early.')
             return False
         self.recv_task.cancel()
+        self._fail_waiters('The connection was closed by disconnect().')
         await self.ws.close()
         self.ws = None
         self.ws_open = False
@@ -130,7 +1173,68 @@ class WebSocketClient:
     async def call(self, request: Request, timeout: int = 15):
         if not self.identified:
             raise NotIdentifiedError('Calls to requests cannot be made without being identified with obs-websocket.')
-        request_id = str(uuid.uuid1())
+        cache = self.response_cache
+        if cache == None or not cache.cacheable(request.requestType, self._active_event_subscriptions()):
+            return await self._call_uncached(request, timeout)
+        key = _request_key(request)
+        response = cache.get(key)
+        if response != None:
+            return response
+        generation = cache.generation(request.requestType)
+        response = await self._call_uncached(request, timeout)
+        if response.ok():
+            cache.put(key, request, response, generation)
+        return response
+
+    async def _call_uncached(self, request: Request, timeout: int):
+        if request.requestType in self.single_flight_types:
+            return await self._call_shared(request, timeout)
+        return await self._call_unshared(request, timeout)
+
+    async def _call_shared(self, request: Request, timeout: int):
+        key = _request_key(request)
+        shared = self.shared_calls.get(key)
+        if shared == None:
+            # The shared call has no timeout of its own. It is cancelled once every caller waiting on it has gone away.
+            shared = _SharedCall(asyncio.create_task(self._call_unshared(request, None)))
+            self.shared_calls[key] = shared
+            shared.task.add_done_callback(lambda task: self.shared_calls.pop(key) if self.shared_calls.get(key) is shared else None)
+        waiter = _ResponseWaiter(request.requestType)
+        shared.waiters.append(waiter)
+        try:
+            return await self._wait_for_response(waiter, timeout)
+        except asyncio.TimeoutError:
+            raise MessageTimeout('The request with type {} timed out after {} seconds.'.format(request.requestType, timeout))
+        finally:
+            self.deadlines.discard(waiter)
+            shared.waiters.remove(waiter)
+            if waiter.future.done() and not waiter.future.cancelled():
+                waiter.future.exception() # Marks an exception of the shared call as retrieved, if this caller was cancelled meanwhile
+            if not shared.waiters and not shared.task.done():
+                shared.task.cancel()
+
+    async def _call_unshared(self, request: Request, timeout: int):
+        deadline = time.monotonic() + timeout if timeout != None else None
+        while True:
+            try:
+                if self.auto_batch:
+                    return await self._call_auto_batched(request, timeout)
+                return await self._call_direct(request, timeout)
+            except ConnectionLostError:
+                if not (self.auto_reconnect and self.replay_requests and not self.closing and request.requestType in IDEMPOTENT_REQUEST_TYPES):
+                    raise
+            # Wait for the session to be identified again, then replay the request with the remaining time
+            if deadline != None:
+                timeout = deadline - time.monotonic()
+            try:
+                await asyncio.wait_for(_wait_for_cond(self.cond, self.is_identified), timeout=timeout)
+            except asyncio.TimeoutError:
+                raise MessageTimeout('The request with type {} timed out after the connection was lost.'.format(request.requestType))
+            if deadline != None:
+                timeout = deadline - time.monotonic()
+
+    async def _call_direct(self, request: Request, timeout: int):
+        request_id = self._new_request_id()
         request_payload = {
             'op': 6,
             'd': {
@@ -140,22 +1244,23 @@ class WebSocketClient:
         }
         if request.requestData != None:
             request_payload['d']['requestData'] = request.requestData
-        log.debug('Sending Request message:\n{}'.format(json.dumps(request_payload, indent=2)))
-        waiter = _ResponseWaiter()
+        waiter = _ResponseWaiter(request.requestType)
         try:
             self.waiters[request_id] = waiter
-            await self.ws.send(msgpack.packb(request_payload))
-            await asyncio.wait_for(waiter.event.wait(), timeout=timeout)
+            await self._send_payload(request_payload, 'Sending Request message')
+            response_data = await self._wait_for_response(waiter, timeout)
         except asyncio.TimeoutError:
             raise MessageTimeout('The request with type {} timed out after {} seconds.'.format(request.requestType, timeout))
+        except websockets.exceptions.ConnectionClosed as e:
+            raise ConnectionLostError('The connection to obs-websocket was lost.') from e
         finally:
-            del self.waiters[request_id]
-        return self._build_request_response(waiter.response_data)
+            self._remove_waiter(request_id)
+        return self._build_request_response(response_data)
 
     async def emit(self, request: Request):
         if not self.identified:
             raise NotIdentifiedError('Emits to requests cannot be made without being identified with obs-websocket.')
-        request_id = str(uuid.uuid1())
+        request_id = self._new_request_id()
         request_payload = {
             'op': 6,
             'd': {
@@ -165,18 +1270,106 @@ class WebSocketClient:
         }
         if request.requestData != None:
             request_payload['d']['requestData'] = request.requestData
-        log.debug('Sending Request message:\n{}'.format(json.dumps(request_payload, indent=2)))
-        await self.ws.send(msgpack.packb(request_payload))
+        await self._send_payload(request_payload, 'Sending Request message')
+
+    async def call_batch(self, requests: list, timeout: int = 15, halt_on_failure: bool = None, execution_type: RequestBatchExecutionType = None, variables: dict = None, chunk_size: int = None, chunk_bytes: int = None, max_in_flight: int = 4, compact: bool = False):
+        if not self.identified:
+            raise NotIdentifiedError('Calls to requests cannot be made without being identified with obs-websocket.')
+        if chunk_size or chunk_bytes:
+            if compact:
+                return BatchResult([result async for result in self._iter_batch_results(requests, timeout, halt_on_failure, execution_type, variables, chunk_size, chunk_bytes, max_in_flight)])
+            return [result async for result in self.iter_batch(requests, timeout, halt_on_failure, execution_type, variables, chunk_size, chunk_bytes, max_in_flight)]
+        results = await self._call_batch_payloads([self._build_batch_request_payload(request) for request in requests], timeout, halt_on_failure, execution_type, variables)
+        if compact:
+            return BatchResult(results)
+        ret = []
+        for result in results:
+            ret.append(self._build_request_response(result))
+        return ret
+
+    async def iter_batch(self, requests: list, timeout: int = 15, halt_on_failure: bool = None, execution_type: RequestBatchExecutionType = None, variables: dict = None, chunk_size: int = None, chunk_bytes: int = None, max_in_flight: int = 4):
+        async for result in self._iter_batch_results(requests, timeout, halt_on_failure, execution_type, variables, chunk_size, chunk_bytes, max_in_flight):
+            yield self._build_request_response(result)
 
-    async def call_batch(self, requests: list, timeout: int = 15, halt_on_failure: bool = None, execution_type: RequestBatchExecutionType = None, variables: dict = None):
+    async def _iter_batch_results(self, requests: list, timeout: int, halt_on_failure: bool, execution_type: RequestBatchExecutionType, variables: dict, chunk_size: int, chunk_bytes: int, max_in_flight: int):
         if not self.identified:
             raise NotIdentifiedError('Calls to requests cannot be made without being identified with obs-websocket.')
-        request_batch_id = str(uuid.uuid1())
+        chunks = self._chunk_batch_requests(requests, chunk_size, chunk_bytes)
+        if execution_type == RequestBatchExecutionType.Parallel:
+            # Parallel chunks are independent, so up to max_in_flight of them are pending at once. Results are still yielded in order.
+            chunk_iterator = iter(chunks)
+            pending = collections.deque()
+            def start_next_chunk():
+                chunk = next(chunk_iterator, None)
+                if chunk == None:
+                    return
+                task = asyncio.create_task(self._call_batch_payloads([payload for request, payload in chunk], timeout, halt_on_failure, execution_type, variables))
+                task.add_done_callback(lambda task: task.cancelled() or task.exception()) # Avoids unretrieved exception warnings for abandoned chunks
+                pending.append(task)
+            for i in range(max(max_in_flight, 1)):
+                start_next_chunk()
+            try:
+                while pending:
+                    results = await pending.popleft()
+                    start_next_chunk()
+                    for result in results:
+                        yield result
+            finally:
+                for task in pending:
+                    task.cancel()
+            return
+        # Serial chunks are sent one after the other. Output variables are carried over from the responses of previous chunks.
+        variables = dict(variables or {})
+        for chunk in chunks:
+            results = await self._call_batch_payloads([payload for request, payload in chunk], timeout, halt_on_failure, execution_type, variables)
+            failed = len(results) != len(chunk)
+            for (request, payload), result in zip(chunk, results):
+                if not result['requestStatus']['result']:
+                    failed = True
+                elif request.outputVariables and result.get('responseData'):
+                    for variable_name, response_field in request.outputVariables.items():
+                        if response_field in result['responseData']:
+                            variables[variable_name] = result['responseData'][response_field]
+                yield result
+            if failed and halt_on_failure:
+                return
+
+    def _chunk_batch_requests(self, requests: list, chunk_size: int, chunk_bytes: int):
+        chunks = []
+        chunk = []
+        size = 0
+        for request in requests:
+            payload = self._build_batch_request_payload(request)
+            payload_size = len(self.encode(payload)) if chunk_bytes else 0
+            if chunk and ((chunk_size and len(chunk) >= chunk_size) or (chunk_bytes and size + payload_size > chunk_bytes)):
+                chunks.append(chunk)
+                chunk = []
+                size = 0
+            chunk.append((request, payload))
+            size += payload_size
+        if chunk:
+            chunks.append(chunk)
+        return chunks
+
+    def _build_batch_request_payload(self, request: Request):
+        request_payload = {
+            'requestType': request.requestType
+        }
+        if request.inputVariables:
+            request_payload['inputVariables'] = request.inputVariables
+        if request.outputVariables:
+            request_payload['outputVariables'] = request.outputVariables
+        if request.requestData:
+            request_payload['requestData'] = request.requestData
+        return request_payload
+
+    async def _call_batch_payloads(self, request_payloads: list, timeout: int, halt_on_failure: bool, execution_type: RequestBatchExecutionType, variables: dict, raw: bool = False):
+        request_batch_id = self._new_request_id()
         request_batch_payload = {
             'op': 8,
             'd': {
                 'requestId': request_batch_id,
-                'requests': []
+                'requests': request_payloads
             }
         }
         if halt_on_failure != None:
@@ -185,36 +1378,49 @@ class WebSocketClient:
             request_batch_payload['d']['executionType'] = execution_type.value
         if variables:
             request_batch_payload['d']['variables'] = variables
-        for request in requests:
-            request_payload = {
-                'requestType': request.requestType
-            }
-            if request.inputVariables:
-                request_payload['inputVariables'] = request.inputVariables
-            if request.outputVariables:
-                request_payload['outputVariables'] = request.outputVariables
-            if request.requestData:
-                request_payload['requestData'] = request.requestData
-            request_batch_payload['d']['requests'].append(request_payload)
-        log.debug('Sending Request batch message:\n{}'.format(json.dumps(request_batch_payload, indent=2)))
-        waiter = _ResponseWaiter()
+        waiter = _ResponseWaiter('RequestBatch', raw)
         try:
             self.waiters[request_batch_id] = waiter
-            await self.ws.send(msgpack.packb(request_batch_payload))
-            await asyncio.wait_for(waiter.event.wait(), timeout=timeout)
+            self.raw_waiters += raw
+            await self._send_payload(request_batch_payload, 'Sending Request batch message')
+            response_data = await self._wait_for_response(waiter, timeout)
         except asyncio.TimeoutError:
             raise MessageTimeout('The request batch timed out after {} seconds.'.format(timeout))
+        except websockets.exceptions.ConnectionClosed as e:
+            raise ConnectionLostError('The connection to obs-websocket was lost.') from e
         finally:
-            del self.waiters[request_batch_id]
-        ret = []
-        for result in waiter.response_data['results']:
-            ret.append(self._build_request_response(result))
-        return ret
+            self.raw_waiters -= raw
+            self._remove_waiter(request_batch_id)
+        if raw:
+            return response_data # The whole encoded RequestBatchResponse message, or its decoded data with the json protocol
+        return response_data['results']
+
+    async def call_template(self, template, values: dict = None, timeout: int = 15):
+        if not self.identified:
+            raise NotIdentifiedError('Calls to requests cannot be made without being identified with obs-websocket.')
+        request_id = self._new_request_id()
+        waiter = _ResponseWaiter(template.requestType)
+        try:
+            self.waiters[request_id] = waiter
+            await self._send_template(template, request_id, values)
+            response_data = await self._wait_for_response(waiter, timeout)
+        except asyncio.TimeoutError:
+            raise MessageTimeout('The request with type {} timed out after {} seconds.'.format(template.requestType, timeout))
+        except websockets.exceptions.ConnectionClosed as e:
+            raise ConnectionLostError('The connection to obs-websocket was lost.') from e
+        finally:
+            self._remove_waiter(request_id)
+        return self._build_request_response(response_data)
+
+    async def emit_template(self, template, values: dict = None):
+        if not self.identified:
+            raise NotIdentifiedError('Emits to requests cannot be made without being identified with obs-websocket.')
+        await self._send_template(template, 'emit_' + self._new_request_id(), values)
 
     async def emit_batch(self, requests: list, halt_on_failure: bool = None, execution_type: RequestBatchExecutionType = None, variables: dict = None):
         if not self.identified:
             raise NotIdentifiedError('Emits to requests cannot be made without being identified with obs-websocket.')
-        request_batch_id = str(uuid.uuid1())
+        request_batch_id = self._new_request_id()
         request_batch_payload = {
             'op': 8,
             'd': {
@@ -235,8 +1441,90 @@ class WebSocketClient:
             if request.requestData:
                 request_payload['requestData'] = request.requestData
             request_batch_payload['d']['requests'].append(request_payload)
-        log.debug('Sending Request batch message:\n{}'.format(json.dumps(request_batch_payload, indent=2)))
-        await self.ws.send(msgpack.packb(request_batch_payload))
+        await self._send_payload(request_batch_payload, 'Sending Request batch message')
+
+    async def _call_auto_batched(self, request: Request, timeout: int):
+        waiter = _ResponseWaiter(request.requestType)
+        self.auto_batch_pending.append((request, waiter.future))
+        if len(self.auto_batch_pending) >= self.auto_batch_max:
+            self._flush_auto_batch()
+        elif self.auto_batch_handle == None:
+            if self.auto_batch_window > 0:
+                self.auto_batch_handle = asyncio.get_running_loop().call_later(self.auto_batch_window, self._flush_auto_batch)
+            else:
+                self.auto_batch_handle = asyncio.get_running_loop().call_soon(self._flush_auto_batch)
+        try:
+            return await self._wait_for_response(waiter, timeout)
+        except asyncio.TimeoutError:
+            if self.metrics != None:
+                self.metrics.timeouts[request.requestType] += 1
+            raise MessageTimeout('The request with type {} timed out after {} seconds.'.format(request.requestType, timeout))
+        finally:
+            self.deadlines.discard(waiter)
+
+    def _flush_auto_batch(self):
+        if self.auto_batch_handle != None:
+            self.auto_batch_handle.cancel()
+            self.auto_batch_handle = None
+        pending = self.auto_batch_pending
+        self.auto_batch_pending = []
+        if pending:
+            asyncio.create_task(self._send_auto_batch(pending))
+
+    async def _send_auto_batch(self, pending: list):
+        pending = [(request, future) for request, future in pending if not future.done()] # Drop calls which timed out or were cancelled before the flush
+        if not pending:
+            return
+        request_batch_id = self._new_request_id()
+        request_batch_payload = {
+            'op': 8,
+            'd': {
+                'requestId': request_batch_id,
+                'executionType': RequestBatchExecutionType.Parallel.value,
+                'requests': []
+            }
+        }
+        for i, (request, future) in enumerate(pending):
+            request_payload = {
+                'requestType': request.requestType,
+                'requestId': str(i)
+            }
+            if request.requestData != None:
+                request_payload['requestData'] = request.requestData
+            request_batch_payload['d']['requests'].append(request_payload)
+        waiter = _ResponseWaiter('RequestBatch')
+        # Each caller enforces its own timeout. Once every caller has given up, stop waiting for the batch response.
+        def on_future_done(_):
+            if all(future.done() for request, future in pending) and not waiter.future.done():
+                waiter.future.set_result(None)
+        for request, future in pending:
+            future.add_done_callback(on_future_done)
+        try:
+            self.waiters[request_batch_id] = waiter
+            await self._send_payload(request_batch_payload, 'Sending auto Request batch message')
+            response_data = await waiter.future
+        except Exception as e:
+            if isinstance(e, websockets.exceptions.ConnectionClosed):
+                e = ConnectionLostError('The connection to obs-websocket was lost.')
+            for request, future in pending:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        finally:
+            self._remove_waiter(request_batch_id)
+        if response_data == None:
+            return
+        results = response_data['results']
+        metrics = self.metrics
+        # The batch itself is recorded as a RequestBatch by the receive task. Also record each call under its own request type.
+        latency = waiter.received_at - waiter.sent_at if metrics != None and waiter.sent_at != None and waiter.received_at != None else None
+        for i, result in enumerate(results):
+            index = int(result['requestId']) if 'requestId' in result else i
+            request, future = pending[index]
+            if metrics != None:
+                metrics._record_response(request.requestType, latency, ()) # Failures were already counted with the batch
+            if not future.done():
+                future.set_result(self._build_request_response(result))
 
     def register_event_callback(self, callback, event: str = None):
         if not inspect.iscoroutinefunction(callback):
@@ -245,6 +1533,14 @@ class WebSocketClient:
             event_callbacks_copy = self.event_callbacks.copy()
             event_callbacks_copy.append((callback, event))
             self.event_callbacks = event_callbacks_copy
+            # The dispatch index is rebuilt copy-on-write so that the receive task never iterates a structure being modified
+            if event == None:
+                self.catchall_callbacks = self.catchall_callbacks + ((callback, len(signature(callback).parameters)),)
+            else:
+                event_callback_index_copy = self.event_callback_index.copy()
+                event_callback_index_copy[event] = event_callback_index_copy.get(event, ()) + (callback,)
+                self.event_callback_index = event_callback_index_copy
+            self._update_event_subscriptions()
 
     def deregister_event_callback(self, callback, event: str = None):
         event_callbacks_copy = self.event_callbacks.copy()
@@ -252,6 +1548,106 @@ class WebSocketClient:
             if (c == callback) and (event == None or t == event):
                 event_callbacks_copy.remove((c, t))
         self.event_callbacks = event_callbacks_copy
+        if event == None:
+            self.catchall_callbacks = tuple((c, params) for c, params in self.catchall_callbacks if c != callback)
+        event_callback_index_copy = {}
+        for t, callbacks in self.event_callback_index.items():
+            if event == None or t == event:
+                callbacks = tuple(c for c in callbacks if c != callback)
+            if callbacks:
+                event_callback_index_copy[t] = callbacks
+        self.event_callback_index = event_callback_index_copy
+        self._update_event_subscriptions()
+
+    def events(self, types = None, maxsize: int = 1024, policy: EventStreamPolicy = EventStreamPolicy.DropOldest, key = None):
+        stream = EventStream(self, types, maxsize, policy, key)
+        self._add_event_stream(stream)
+        return stream
+
+    def _add_event_stream(self, stream):
+        self.event_streams = self.event_streams + (stream,)
+        self._update_event_subscriptions()
+
+    def _remove_event_stream(self, stream):
+        self.event_streams = tuple(s for s in self.event_streams if s is not stream)
+        self._update_event_subscriptions()
+
+    def get_required_event_subscriptions(self):
+        subscriptions = EventSubscription(self.identification_parameters.eventSubscriptions or 0)
+        if self.catchall_callbacks:
+            subscriptions |= EventSubscription.All
+        event_types = set(self.event_callback_index)
+        for stream in self.event_streams:
+            if stream.types == None:
+                subscriptions |= EventSubscription.All
+            else:
+                event_types.update(stream.types)
+        if self.response_cache != None:
+            event_types.update(self.response_cache.invalidation_rules)
+        for event_type in event_types:
+            subscriptions |= EVENT_SUBSCRIPTIONS.get(event_type, EventSubscription.All)
+        return int(subscriptions)
+
+    def _active_event_subscriptions(self):
+        if self.auto_event_subscriptions and self.event_subscriptions != None:
+            return self.event_subscriptions
+        if self.identification_parameters.eventSubscriptions != None:
+            return self.identification_parameters.eventSubscriptions
+        return EventSubscription.All # obs-websocket default
+
+    def _update_event_subscriptions(self):
+        self.catchall_consumers = bool(self.catchall_callbacks) or any(stream.types == None for stream in self.event_streams)
+        if not self.auto_event_subscriptions or not self.identified:
+            return
+        if self.reidentify_task == None or self.reidentify_task.done():
+            # Deferred, so that several registrations made at once only result in a single Reidentify
+            self.reidentify_task = asyncio.create_task(self._send_reidentify())
+
+    async def _send_reidentify(self):
+        await asyncio.sleep(0)
+        event_subscriptions = self.get_required_event_subscriptions()
+        if event_subscriptions == self.event_subscriptions or not self.identified:
+            return
+        self.event_subscriptions = event_subscriptions
+        reidentify_message = {'op': 3, 'd': {'eventSubscriptions': event_subscriptions}}
+        try:
+            await self._send_payload(reidentify_message, 'Sending Reidentify message')
+        except websockets.exceptions.ConnectionClosed:
+            pass
+
+    def register_lifecycle_callback(self, callback, event: LifecycleEvent = None):
+        if not inspect.iscoroutinefunction(callback):
+            raise EventRegistrationError('Registered functions must be async')
+        self.lifecycle_callbacks = self.lifecycle_callbacks + ((callback, event),)
+
+    def deregister_lifecycle_callback(self, callback, event: LifecycleEvent = None):
+        self.lifecycle_callbacks = tuple((c, t) for c, t in self.lifecycle_callbacks if not (c == callback and (event == None or t == event)))
+
+    def _dispatch_lifecycle_event(self, event: LifecycleEvent):
+        for callback, trigger in self.lifecycle_callbacks:
+            if trigger == None or trigger == event:
+                asyncio.create_task(callback(event))
+
+    async def _wait_for_response(self, waiter: _ResponseWaiter, timeout: float):
+        if timeout != None:
+            self.deadlines.add(waiter, timeout)
+        return await waiter.future
+
+    def _remove_waiter(self, request_id: str):
+        waiter = self.waiters.pop(request_id)
+        self.deadlines.discard(waiter)
+        future = waiter.future
+        if not future.done():
+            future.cancel() # The caller stopped before the response arrived, for example because sending failed
+        elif not future.cancelled():
+            future.exception() # Marks a ConnectionLostError set while the caller was still sending as retrieved
+        if self.metrics != None:
+            self.metrics._record_completion(waiter)
+
+    def _fail_waiters(self, message: str):
+        for waiter in self.waiters.values():
+            if not waiter.future.done():
+                waiter.future.set_exception(ConnectionLostError(message))
 
     def is_identified(self):
         return self.identified
@@ -266,6 +1662,153 @@ class WebSocketClient:
         ret.requestStatus.comment = response['requestStatus'].get('comment')
         return ret
 
+    def _dispatch_event(self, data_payload):
+        if self.response_cache != None:
+            self.response_cache.invalidate_event(data_payload['eventType'], data_payload.get('eventData'))
+        metrics = self.metrics
+        if metrics != None:
+            metrics.events[data_payload['eventType']] += 1
+        for callback, params in self.catchall_callbacks:
+            if params == 1:
+                coroutine = callback(data_payload)
+            elif params == 2:
+                coroutine = callback(data_payload['eventType'], data_payload.get('eventData'))
+            elif params == 3:
+                coroutine = callback(data_payload['eventType'], data_payload.get('eventIntent'), data_payload.get('eventData'))
+            else:
+                continue
+            asyncio.create_task(coroutine if metrics == None else metrics._time_callback(callback, coroutine))
+        callbacks = self.event_callback_index.get(data_payload['eventType'])
+        if callbacks:
+            event_data = data_payload.get('eventData')
+            for callback in callbacks:
+                asyncio.create_task(callback(event_data) if metrics == None else metrics._time_callback(callback, callback(event_data)))
+        blocking_streams = None
+        for stream in self.event_streams:
+            if stream.types == None or data_payload['eventType'] in stream.types:
+                if stream.policy == EventStreamPolicy.Block:
+                    if blocking_streams == None:
+                        blocking_streams = []
+                    blocking_streams.append(stream)
+                else:
+                    stream._offer(data_payload)
+        return blocking_streams
+
+    def _resolve_raw_waiter(self, message: bytes, tracing: bool):
+        waiter = self.waiters.get(_peek_message(message, self.peek_unpacker)[0])
+        if waiter == None or not waiter.raw:
+            return False
+        if tracing:
+            self._trace('recv', 'Received message', msgpack.unpackb(message))
+        if not waiter.future.done():
+            waiter.future.set_result(message)
+        if self.metrics != None:
+            waiter.received_at = time.perf_counter()
+            # The results are not decoded here, so failed results are counted by whoever decodes them
+            self.metrics._record_response(waiter.request_type, waiter.received_at - waiter.sent_at if waiter.sent_at != None else None, ())
+        return True
+
+    def _discard_message(self, message: bytes):
+        request_id, event_type = _peek_message(message, self.peek_unpacker)
+        if request_id != None:
+            if request_id.startswith('emit_'):
+                discard = True
+            elif request_id not in self.waiters:
+                log.warning('Discarding request response {} because there is no waiter for it.'.format(request_id))
+                discard = True
+            else:
+                return False
+        elif event_type != None:
+            if self._has_event_consumers(event_type):
+                return False
+            discard = True
+        else:
+            return False
+        if self.metrics != None:
+            self.metrics._record_discard(len(message), event_type)
+        return discard
+
+    def _has_event_consumers(self, event_type: str):
+        if self.catchall_callbacks or event_type in self.event_callback_index:
+            return True
+        if self.response_cache != None and event_type in self.response_cache.invalidation_rules:
+            return True
+        for stream in self.event_streams:
+            if stream.types == None or event_type in stream.types:
+                return True
+        return False
+
+    def _trace(self, direction, message, payload):
+        if self.trace_hook != None:
+            try:
+                self.trace_hook(direction, payload)
+            except Exception:
+                log.exception('Trace hook raised an exception:\n')
+        if log.isEnabledFor(logging.DEBUG):
+            log.debug('%s:\n%s', message, _LoggedPayload(payload, self.log_payload_limit))
+
+    async def _send_payload(self, payload, message):
+        if self.trace_hook != None or log.isEnabledFor(logging.DEBUG):
+            self._trace('send', message, payload)
+        if self.metrics == None and self.recorder == None:
+            if self.coalesce_writes:
+                self._cork()
+            await self.ws.send(self.encode(payload), text = self.text_frames)
+            return
+        start = time.perf_counter()
+        await self._send_encoded(self.encode(payload), payload['op'], payload['d'].get('requestId'), start)
+
+    async def _send_template(self, template, request_id: str, values: dict):
+        if self.trace_hook != None or log.isEnabledFor(logging.DEBUG):
+            self._trace('send', 'Sending Request message', template.build(request_id, values))
+        if self.text_frames:
+            message = self.encode(template.build(request_id, values)) # Templates are precompiled for msgpack only
+        else:
+            message = template.encode(request_id, values, self.packer.pack)
+        if self.metrics == None and self.recorder == None:
+            if self.coalesce_writes:
+                self._cork()
+            await self.ws.send(message, text = self.text_frames)
+            return
+        await self._send_encoded(message, 6, request_id, time.perf_counter())
+
+    async def _send_encoded(self, message: bytes, op_code: int, request_id: str, start: float):
+        # Slow path of _send_payload() and _send_template(), for recording and metrics
+        encoded = time.perf_counter()
+        if self.recorder != None:
+            self.recorder.record(message, False)
+        if self.coalesce_writes:
+            self._cork()
+        if self.metrics == None:
+            await self.ws.send(message, text = self.text_frames)
+            return
+        self._mark_sent(request_id)
+        await self.ws.send(message, text = self.text_frames)
+        self.metrics._record_send(op_code, len(message), encoded - start, time.perf_counter() - encoded)
+
+    def _cork(self):
+        # Holds back partial TCP segments until the end of the event loop iteration, so that the frames sent during it leave together
+        if self.corked or self.ws_socket == None or _TCP_CORK == None:
+            return
+        self.ws_socket.setsockopt(socket.IPPROTO_TCP, _TCP_CORK, 1)
+        self.corked = True
+        asyncio.get_running_loop().call_soon(self._uncork, self.ws_socket)
+
+    def _uncork(self, sock):
+        self.corked = False
+        try:
+            sock.setsockopt(socket.IPPROTO_TCP, _TCP_CORK, 0)
+        except OSError:
+            pass # The connection was closed in the meantime
+
+    def _mark_sent(self, request_id: str):
+        waiter = self.waiters.get(request_id)
+        if waiter != None:
+            waiter.sent_at = time.perf_counter()
+
+    def _new_request_id(self):
+        return self.request_id_prefix + str(next(self.request_id_counter))
+
     async def _send_identify(self, password, identification_parameters):
         if self.hello_message == None:
             return
@@ -277,60 +1820,1330 @@ class WebSocketClient:
             identify_message['d']['authentication'] = authentication_string
         if self.identification_parameters.ignoreNonFatalRequestChecks != None:
             identify_message['d']['ignoreNonFatalRequestChecks'] = self.identification_parameters.ignoreNonFatalRequestChecks
-        if self.identification_parameters.eventSubscriptions != None:
+        if self.auto_event_subscriptions:
+            self.event_subscriptions = self.get_required_event_subscriptions()
+            identify_message['d']['eventSubscriptions'] = self.event_subscriptions
+        elif self.identification_parameters.eventSubscriptions != None:
             identify_message['d']['eventSubscriptions'] = self.identification_parameters.eventSubscriptions
-        log.debug('Sending Identify message:\n{}'.format(json.dumps(identify_message, indent=2)))
-        await self.ws.send(msgpack.packb(identify_message))
+        await self._send_payload(identify_message, 'Sending Identify message')
+
+    async def _handle_message(self, message):
+        if not message:
+            return
+        tracing = self.trace_hook != None or log.isEnabledFor(logging.DEBUG)
+        if type(message) == bytes:
+            if self.raw_waiters and self._resolve_raw_waiter(message, tracing):
+                return
+            if self.lazy_decode_threshold and len(message) >= self.lazy_decode_threshold and not tracing and not self.catchall_consumers and self._discard_message(message):
+                return
+            decode = msgpack.unpackb
+        else:
+            decode = self.json_loads # Text frame, with the json protocol
+        if self.metrics == None:
+            incoming_payload = decode(message)
+        else:
+            start = time.perf_counter()
+            incoming_payload = decode(message)
+            self.metrics._record_receive(incoming_payload['op'], len(message), time.perf_counter() - start)
+
+        if tracing:
+            self._trace('recv', 'Received message', incoming_payload)
+
+        op_code = incoming_payload['op']
+        data_payload = incoming_payload['d']
+        if op_code == 7 or op_code == 9: # RequestResponse or RequestBatchResponse
+            paylod_request_id = data_payload['requestId']
+            if paylod_request_id.startswith('emit_'):
+                return
+            try:
+                waiter = self.waiters[paylod_request_id]
+                if not waiter.future.done():
+                    waiter.future.set_result(data_payload)
+                if self.metrics != None:
+                    waiter.received_at = time.perf_counter()
+                    latency = waiter.received_at - waiter.sent_at if waiter.sent_at != None else None
+                    if op_code == 7:
+                        self.metrics._record_response(waiter.request_type, latency, (data_payload,))
+                    else:
+                        self.metrics._record_response(waiter.request_type, latency, data_payload['results'])
+            except KeyError:
+                log.warning('Discarding request response {} because there is no waiter for it.'.format(paylod_request_id))
+        elif op_code == 5: # Event
+            blocking_streams = self._dispatch_event(data_payload)
+            if blocking_streams:
+                for stream in blocking_streams: # Applies backpressure to the connection until the streams have room
+                    await stream._put(data_payload)
+        elif op_code == 0: # Hello
+            self.hello_message = data_payload
+            await self._send_identify(self.password, self.identification_parameters)
+        elif op_code == 2: # Identified
+            if self.identified:
+                return # Response to a Reidentify, nothing changed for the session
+            self.identified = True
+            self.next_reconnect_delay = self.reconnect_delay
+            self._dispatch_lifecycle_event(LifecycleEvent.Identified)
+            if self.auto_event_subscriptions and self.event_subscriptions != self.get_required_event_subscriptions():
+                self._update_event_subscriptions() # Registrations changed while the Identify was in flight
+            async with self.cond:
+                self.cond.notify_all()
+        else:
+            log.warning('Unknown OpCode: {}'.format(op_code))
 
     async def _ws_recv_task(self):
         while self.ws_open:
             message = ''
             try:
                 message = await self.ws.recv()
-                if not message or type(message) != bytes:
-                    continue
-                incoming_payload = msgpack.unpackb(message)
-
-                log.debug('Received message:\n{}'.format(json.dumps(incoming_payload, indent=2)))
-
-                op_code = incoming_payload['op']
-                data_payload = incoming_payload['d']
-                if op_code == 7 or op_code == 9: # RequestResponse or RequestBatchResponse
-                    paylod_request_id = data_payload['requestId']
-                    if paylod_request_id.startswith('emit_'):
-                        continue
-                    try:
-                        waiter = self.waiters[paylod_request_id]
-                        waiter.response_data = data_payload
-                        waiter.event.set()
-                    except KeyError:
-                        log.warning('Discarding request response {} because there is no waiter for it.'.format(paylod_request_id))
-                elif op_code == 5: # Event
-                    for callback, trigger in self.event_callbacks:
-                        if trigger == None:
-                            params = len(signature(callback).parameters)
-                            if params == 1:
-                                asyncio.create_task(callback(data_payload))
-                            elif params == 2:
-                                asyncio.create_task(callback(data_payload['eventType'], data_payload.get('eventData')))
-                            elif params == 3:
-                                asyncio.create_task(callback(data_payload['eventType'], data_payload.get('eventIntent'), data_payload.get('eventData')))
-                        elif trigger == data_payload['eventType']:
-                            asyncio.create_task(callback(data_payload.get('eventData')))
-                elif op_code == 0: # Hello
-                    self.hello_message = data_payload
-                    await self._send_identify(self.password, self.identification_parameters)
-                elif op_code == 2: # Identified
-                    self.identified = True
-                    async with self.cond:
-                        self.cond.notify_all()
-                else:
-                    log.warning('Unknown OpCode: {}'.format(op_code))
+                if self.recorder != None:
+                    self.recorder.record(message, True)
+                await self._handle_message(message)
             except (websockets.exceptions.ConnectionClosed, websockets.exceptions.ConnectionClosedError, websockets.exceptions.ConnectionClosedOK):
                 log.debug('The WebSocket connection was closed. Code: {} | Reason: {}'.format(self.ws.close_code, self.ws.close_reason))
                 self.ws_open = False
                 break
             except (ValueError, msgpack.UnpackException):
                 continue
+            except Exception:
+                # Anything else leaves the session in an unknown state. Treat it as lost, so that waiters fail and auto_reconnect can start.
+                log.exception('Unexpected error while handling a message. Closing the connection:\n')
+                self.ws_open = False
+                asyncio.create_task(self.ws.close())
+                break
         self.ws_open = False
         self.identified = False
+        if self.closing:
+            return
+        self.close_code = self.ws.close_code
+        self.close_reason = self.ws.close_reason
+        self._fail_waiters('The connection to obs-websocket was lost.')
+        self._dispatch_lifecycle_event(LifecycleEvent.ConnectionLost)
+        if not self.auto_reconnect:
+            return
+        if self.close_code in PERMANENT_CLOSE_CODES:
+            log.error('Not reconnecting, as obs-websocket closed the connection with code {} ({}): {}'.format(self.close_code, PERMANENT_CLOSE_CODES[self.close_code], self.close_reason))
+            return
+        self.reconnect_task = asyncio.create_task(self._reconnect())
+
+class StateMirror:
+    def __init__(self, client: WebSocketClient, timeout: int = 15, track_transforms: bool = True):
+        self.client = client
+        self.timeout = timeout
+        self.track_transforms = track_transforms
+
+        self.scenes = {} # sceneName -> scene object as returned by GetSceneList
+        self.inputs = {} # inputName -> input object as returned by GetInputList
+        self.scene_items = {} # sceneName -> {sceneItemId -> scene item object as returned by GetSceneItemList}
+        self.scene_item_ids = {} # sceneName -> {sourceName -> sceneItemId}
+        self.current_program_scene = None
+        self.current_preview_scene = None
+        self.synced = False
+        self.event_backlog = None # Events received while a sync is in progress, applied once it completes
+        self.sync_task = None
+        self.callbacks = []
+
+    async def start(self):
+        handlers = {
+            'CurrentSceneCollectionChanged': self._apply_collection_changed,
+            'SceneCreated': self._apply_scene_created,
+            'SceneRemoved': self._apply_scene_removed,
+            'SceneNameChanged': self._apply_scene_name_changed,
+            'SceneListChanged': self._apply_scene_list_changed,
+            'CurrentProgramSceneChanged': self._apply_current_program_scene_changed,
+            'CurrentPreviewSceneChanged': self._apply_current_preview_scene_changed,
+            'InputCreated': self._apply_input_created,
+            'InputRemoved': self._apply_input_removed,
+            'InputNameChanged': self._apply_input_name_changed,
+            'SceneItemCreated': self._apply_scene_item_created,
+            'SceneItemRemoved': self._apply_scene_item_removed,
+            'SceneItemListReindexed': self._apply_scene_item_list_reindexed,
+            'SceneItemEnableStateChanged': self._apply_scene_item_enable_state_changed,
+            'SceneItemLockStateChanged': self._apply_scene_item_lock_state_changed,
+        }
+        if self.track_transforms:
+            handlers['SceneItemTransformChanged'] = self._apply_scene_item_transform_changed
+        for event_type, apply in handlers.items():
+            callback = self._make_callback(apply)
+            self.client.register_event_callback(callback, event_type)
+            self.callbacks.append((callback, event_type))
+        self.client.register_lifecycle_callback(self._on_identified, LifecycleEvent.Identified)
+        if self.client.is_identified():
+            await self.sync()
+
+    async def stop(self):
+        for callback, event_type in self.callbacks:
+            self.client.deregister_event_callback(callback, event_type)
+        self.callbacks = []
+        self.client.deregister_lifecycle_callback(self._on_identified)
+        if self.sync_task != None:
+            self.sync_task.cancel()
+            self.sync_task = None
+        self.synced = False
+
+    async def sync(self):
+        backlog = []
+        self.event_backlog = backlog
+        self.synced = False
+        try:
+            self._load_snapshot(await self._fetch_snapshot())
+            for apply, event_data in backlog: # Events may already be reflected in the snapshot. Applying them again is harmless.
+                apply(event_data)
+            self.synced = True
+        finally:
+            if self.event_backlog is backlog:
+                self.event_backlog = None
+
+    async def verify(self):
+        start = time.perf_counter()
+        snapshot = await self._fetch_snapshot()
+        fetch_seconds = time.perf_counter() - start
+        start = time.perf_counter()
+        local = (self.scenes, self.inputs, self.scene_items, self.current_program_scene, self.current_preview_scene)
+        local_item_count = sum(len(items) for items in self.scene_items.values())
+        local_seconds = time.perf_counter() - start
+        differences = []
+        for name, local_value, remote_value in zip(('scenes', 'inputs', 'scene_items', 'current_program_scene', 'current_preview_scene'), local, snapshot):
+            if isinstance(remote_value, dict):
+                for key in local_value.keys() | remote_value.keys():
+                    if local_value.get(key) != remote_value.get(key):
+                        differences.append('{}[{!r}]: mirror {!r}, obs {!r}'.format(name, key, local_value.get(key), remote_value.get(key)))
+            elif local_value != remote_value:
+                differences.append('{}: mirror {!r}, obs {!r}'.format(name, local_value, remote_value))
+        return {
+            'consistent': not differences,
+            'differences': differences,
+            'fetch_seconds': fetch_seconds,
+            'local_seconds': local_seconds,
+            'scene_item_count': local_item_count
+        }
+
+    def get_scene_names(self):
+        return [scene['sceneName'] for scene in sorted(self.scenes.values(), key=lambda scene: scene['sceneIndex'])]
+
+    def get_scene(self, scene_name: str):
+        return self.scenes.get(scene_name)
+
+    def get_input(self, input_name: str):
+        return self.inputs.get(input_name)
+
+    def get_scene_items(self, scene_name: str):
+        items = self.scene_items.get(scene_name)
+        if items == None:
+            return None
+        return sorted(items.values(), key=lambda item: item['sceneItemIndex'])
+
+    def get_scene_item(self, scene_name: str, scene_item_id: int):
+        return self.scene_items.get(scene_name, {}).get(scene_item_id)
+
+    def get_scene_item_id(self, scene_name: str, source_name: str):
+        return self.scene_item_ids.get(scene_name, {}).get(source_name)
+
+    async def _on_identified(self, event: LifecycleEvent = None):
+        if self.sync_task != None:
+            self.sync_task.cancel()
+        self.sync_task = asyncio.create_task(self._sync_logged())
+
+    async def _sync_logged(self):
+        try:
+            await self.sync()
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            log.exception('Failed to synchronize the state mirror:\n')
+
+    async def _fetch_snapshot(self):
+        scene_list, input_list = await self.client.call_batch([Request('GetSceneList'), Request('GetInputList')], timeout = self.timeout)
+        if not scene_list.ok() or not input_list.ok():
+            raise MirrorSyncError('Failed to fetch the scene and input lists. Codes: {} {}'.format(scene_list.requestStatus.code, input_list.requestStatus.code))
+        scenes = {scene['sceneName']: scene for scene in scene_list.responseData['scenes']}
+        inputs = {input['inputName']: input for input in input_list.responseData['inputs']}
+        scene_items = {}
+        if scenes:
+            # Scene item lists can only be requested once the scene names are known, so they are fetched in a second batch
+            scene_names = list(scenes)
+            results = await self.client.call_batch([Request('GetSceneItemList', {'sceneName': scene_name}) for scene_name in scene_names], timeout = self.timeout, execution_type = RequestBatchExecutionType.Parallel)
+            for scene_name, result in zip(scene_names, results):
+                if not result.ok():
+                    raise MirrorSyncError('Failed to fetch the scene item list of scene `{}`. Code: {}'.format(scene_name, result.requestStatus.code))
+                scene_items[scene_name] = {item['sceneItemId']: item for item in result.responseData['sceneItems']}
+        return (scenes, inputs, scene_items, scene_list.responseData.get('currentProgramSceneName'), scene_list.responseData.get('currentPreviewSceneName'))
+
+    def _load_snapshot(self, snapshot):
+        self.scenes, self.inputs, self.scene_items, self.current_program_scene, self.current_preview_scene = snapshot
+        self.scene_item_ids = {}
+        for scene_name in self.scene_items:
+            self._reindex_scene(scene_name)
+
+    def _make_callback(self, apply):
+        async def callback(eventData):
+            if self.event_backlog != None:
+                self.event_backlog.append((apply, eventData))
+            else:
+                apply(eventData)
+        return callback
+
+    def _reindex_scene(self, scene_name: str):
+        ids = {}
+        for item in sorted(self.scene_items[scene_name].values(), key=lambda item: item['sceneItemIndex'], reverse=True):
+            ids[item['sourceName']] = item['sceneItemId'] # The lowest index wins
+        self.scene_item_ids[scene_name] = ids
+
+    def _refresh_scene_items(self, scene_name: str):
+        async def refresh():
+            try:
+                result = await self.client.call(Request('GetSceneItemList', {'sceneName': scene_name}), timeout = self.timeout)
+            except (MessageTimeout, NotIdentifiedError):
+                return
+            if result.ok() and scene_name in self.scene_items:
+                self.scene_items[scene_name] = {item['sceneItemId']: item for item in result.responseData['sceneItems']}
+                self._reindex_scene(scene_name)
+        asyncio.create_task(refresh())
+
+    def _apply_collection_changed(self, event_data):
+        asyncio.create_task(self._on_identified())
+
+    def _apply_scene_created(self, event_data):
+        if event_data.get('isGroup'):
+            return
+        scene_name = event_data['sceneName']
+        if scene_name not in self.scenes:
+            self.scenes[scene_name] = {'sceneIndex': len(self.scenes), 'sceneName': scene_name, 'sceneUuid': event_data.get('sceneUuid')}
+        self.scene_items.setdefault(scene_name, {})
+        self.scene_item_ids.setdefault(scene_name, {})
+
+    def _apply_scene_removed(self, event_data):
+        scene_name = event_data['sceneName']
+        self.scenes.pop(scene_name, None)
+        self.scene_items.pop(scene_name, None)
+        self.scene_item_ids.pop(scene_name, None)
+
+    def _apply_scene_name_changed(self, event_data):
+        old_name = event_data['oldSceneName']
+        new_name = event_data['sceneName']
+        for mapping in (self.scenes, self.scene_items, self.scene_item_ids):
+            if old_name in mapping:
+                mapping[new_name] = mapping.pop(old_name)
+        if new_name in self.scenes:
+            self.scenes[new_name]['sceneName'] = new_name
+        if self.current_program_scene == old_name:
+            self.current_program_scene = new_name
+        if self.current_preview_scene == old_name:
+            self.current_preview_scene = new_name
+        self._rename_source(old_name, new_name) # Scenes can be nested in other scenes
+
+    def _apply_scene_list_changed(self, event_data):
+        scenes = {scene['sceneName']: scene for scene in event_data['scenes']}
+        for scene_name in self.scenes.keys() - scenes.keys():
+            self._apply_scene_removed({'sceneName': scene_name})
+        for scene_name in scenes.keys() - self.scenes.keys():
+            self.scene_items[scene_name] = {}
+            self.scene_item_ids[scene_name] = {}
+            self._refresh_scene_items(scene_name)
+        self.scenes = scenes
+
+    def _apply_current_program_scene_changed(self, event_data):
+        self.current_program_scene = event_data['sceneName']
+
+    def _apply_current_preview_scene_changed(self, event_data):
+        self.current_preview_scene = event_data['sceneName']
+
+    def _apply_input_created(self, event_data):
+        self.inputs[event_data['inputName']] = {
+            'inputKind': event_data.get('inputKind'),
+            'inputName': event_data['inputName'],
+            'inputUuid': event_data.get('inputUuid'),
+            'unversionedInputKind': event_data.get('unversionedInputKind')
+        }
+
+    def _apply_input_removed(self, event_data):
+        self.inputs.pop(event_data['inputName'], None)
+
+    def _apply_input_name_changed(self, event_data):
+        old_name = event_data['oldInputName']
+        new_name = event_data['inputName']
+        if old_name in self.inputs:
+            self.inputs[new_name] = self.inputs.pop(old_name)
+            self.inputs[new_name]['inputName'] = new_name
+        self._rename_source(old_name, new_name)
+
+    def _rename_source(self, old_name: str, new_name: str):
+        for scene_name, items in self.scene_items.items():
+            renamed = False
+            for item in items.values():
+                if item['sourceName'] == old_name:
+                    item['sourceName'] = new_name
+                    renamed = True
+            if renamed:
+                self._reindex_scene(scene_name)
+
+    def _apply_scene_item_created(self, event_data):
+        scene_name = event_data['sceneName']
+        items = self.scene_items.get(scene_name)
+        if items == None:
+            return
+        items[event_data['sceneItemId']] = {
+            'sceneItemId': event_data['sceneItemId'],
+            'sceneItemIndex': event_data['sceneItemIndex'],
+            'sourceName': event_data['sourceName'],
+            'sourceUuid': event_data.get('sourceUuid')
+        }
+        self._reindex_scene(scene_name)
+        self._refresh_scene_items(scene_name) # The event does not carry the transform and other state of the new item
+
+    def _apply_scene_item_removed(self, event_data):
+        scene_name = event_data['sceneName']
+        items = self.scene_items.get(scene_name)
+        if items == None or items.pop(event_data['sceneItemId'], None) == None:
+            return
+        self._reindex_scene(scene_name)
+
+    def _apply_scene_item_list_reindexed(self, event_data):
+        scene_name = event_data['sceneName']
+        items = self.scene_items.get(scene_name)
+        if items == None:
+            return
+        for reindexed_item in event_data['sceneItems']:
+            item = items.get(reindexed_item['sceneItemId'])
+            if item != None:
+                item['sceneItemIndex'] = reindexed_item['sceneItemIndex']
+        self._reindex_scene(scene_name)
+
+    def _apply_scene_item_enable_state_changed(self, event_data):
+        item = self.get_scene_item(event_data['sceneName'], event_data['sceneItemId'])
+        if item != None:
+            item['sceneItemEnabled'] = event_data['sceneItemEnabled']
+
+    def _apply_scene_item_lock_state_changed(self, event_data):
+        item = self.get_scene_item(event_data['sceneName'], event_data['sceneItemId'])
+        if item != None:
+            item['sceneItemLocked'] = event_data['sceneItemLocked']
+
+    def _apply_scene_item_transform_changed(self, event_data):
+        item = self.get_scene_item(event_data['sceneName'], event_data['sceneItemId'])
+        if item != None:
+            item['sceneItemTransform'] = event_data['sceneItemTransform']
+
+class _TaggedEventStream:
+    # Feeds the events of one fleet member into a merged EventStream, tagged with the name of the member
+    __slots__ = ('stream', 'name', 'types', 'policy')
+
+    def __init__(self, stream: EventStream, name: str):
+        self.stream = stream
+        self.name = name
+        self.types = stream.types
+        self.policy = stream.policy
+
+    def _offer(self, payload):
+        self.stream._offer((self.name, payload))
+
+    async def _put(self, payload):
+        await self.stream._put((self.name, payload))
+
+class FleetClient:
+    def __init__(self, clients: dict = None, tags: dict = None):
+        self.clients = {}
+        self.tags = {}
+        self.streams = {} # Merged EventStream -> (tags, list of (client, _TaggedEventStream))
+        tags = tags or {}
+        for name, client in (clients or {}).items():
+            self.add_client(name, client, tags.get(name, ()))
+
+    def add_client(self, name: str, client: WebSocketClient, tags = ()):
+        if name in self.clients:
+            raise ValueError('A client named `{}` is already part of the fleet.'.format(name))
+        self.clients[name] = client
+        self.tags[name] = frozenset(tags)
+        for stream, (stream_tags, sources) in self.streams.items():
+            if stream_tags <= self.tags[name]:
+                source = _TaggedEventStream(stream, name)
+                client._add_event_stream(source)
+                sources.append((client, source))
+
+    def remove_client(self, name: str):
+        client = self.clients.pop(name)
+        del self.tags[name]
+        for stream, (stream_tags, sources) in self.streams.items():
+            for c, source in [(c, source) for c, source in sources if c is client]:
+                client._remove_event_stream(source)
+                sources.remove((c, source))
+        return client
+
+    def select(self, tags = None):
+        if not tags:
+            return list(self.clients)
+        tags = frozenset(tags)
+        return [name for name, client_tags in self.tags.items() if tags <= client_tags]
+
+    async def connect(self, timeout: int = 10, tags = None):
+        return await self._gather(tags, lambda client: self._connect_client(client, timeout))
+
+    async def disconnect(self, tags = None):
+        return await self._gather(tags, lambda client: client.disconnect())
+
+    async def call_all(self, request: Request, timeout: int = 15, tags = None):
+        return await self._gather(tags, lambda client: client.call(request, timeout))
+
+    async def call_batch_all(self, requests: list, timeout: int = 15, halt_on_failure: bool = None, execution_type: RequestBatchExecutionType = None, variables: dict = None, tags = None):
+        return await self._gather(tags, lambda client: client.call_batch(requests, timeout, halt_on_failure, execution_type, variables))
+
+    async def emit_all(self, request: Request, tags = None):
+        return await self._gather(tags, lambda client: client.emit(request))
+
+    def events(self, types = None, maxsize: int = 1024, policy: EventStreamPolicy = EventStreamPolicy.DropOldest, key = None, tags = None):
+        if key == None:
+            key = _event_type_key
+        stream = EventStream(self, types, maxsize, policy, lambda item: (item[0], key(item[1])))
+        sources = []
+        for name in self.select(tags):
+            source = _TaggedEventStream(stream, name)
+            self.clients[name]._add_event_stream(source)
+            sources.append((self.clients[name], source))
+        self.streams[stream] = (frozenset(tags or ()), sources)
+        return stream
+
+    def _remove_event_stream(self, stream: EventStream):
+        stream_tags, sources = self.streams.pop(stream, (None, ()))
+        for client, source in sources:
+            client._remove_event_stream(source)
+
+    async def _connect_client(self, client: WebSocketClient, timeout: int):
+        await asyncio.wait_for(client.connect(), timeout=timeout)
+        if not await client.wait_until_identified(timeout):
+            raise MessageTimeout('Identification with obs-websocket timed out after {} seconds.'.format(timeout))
+        return True
+
+    async def _gather(self, tags, func):
+        names = self.select(tags)
+        results = await asyncio.gather(*[func(self.clients[name]) for name in names], return_exceptions = True)
+        for result in results:
+            if isinstance(result, asyncio.CancelledError):
+                raise result
+        return dict(zip(names, results))
+
+def _log_callback_exception(future: concurrent.futures.Future):
+    if not future.cancelled() and future.exception() != None:
+        log.error('Event callback raised an exception:', exc_info = future.exception())
+
+class SyncWebSocketClient:
+    def __init__(self, url: str = "ws://localhost:4444", password: str = '', callback_executor = None, callback_workers: int = 4, **kwargs):
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target = self._run_loop, name = 'simpleobsws', daemon = True)
+        self.thread.start()
+        self.own_executor = callback_executor == None
+        self.callback_executor = callback_executor or concurrent.futures.ThreadPoolExecutor(max_workers = callback_workers, thread_name_prefix = 'simpleobsws-callback')
+        self.callbacks = {} # (callback, event) -> async wrapper registered with the client
+        self.lock = threading.Lock()
+        self.closed = False
+        # Created on the loop thread, as some asyncio primitives bind to the running loop
+        self.client = self._run(self._create_client(url, password, kwargs))
+
+    def _run_loop(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    async def _create_client(self, url, password, kwargs):
+        return WebSocketClient(url, password, **kwargs)
+
+    def _run(self, coroutine):
+        if threading.get_ident() == self.thread.ident:
+            coroutine.close()
+            raise RuntimeError('SyncWebSocketClient methods cannot be called from its own event loop thread. Use the async client attribute there.')
+        return asyncio.run_coroutine_threadsafe(coroutine, self.loop).result()
+
+    async def _call_soon(self, function, *args):
+        return function(*args)
+
+    def connect(self, timeout: int = 10):
+        self._run(self.client.connect())
+        return self._run(self.client.wait_until_identified(timeout))
+
+    def disconnect(self):
+        return self._run(self.client.disconnect())
+
+    def close(self):
+        with self.lock:
+            if self.closed:
+                return
+            self.closed = True
+        if self.client.ws != None:
+            self._run(self.client.disconnect())
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+        self.loop.close()
+        if self.own_executor:
+            self.callback_executor.shutdown(wait = False)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def is_identified(self):
+        return self.client.is_identified()
+
+    def call(self, request: Request, timeout: int = 15):
+        return self._run(self.client.call(request, timeout))
+
+    def emit(self, request: Request):
+        return self._run(self.client.emit(request))
+
+    def call_batch(self, requests: list, timeout: int = 15, halt_on_failure: bool = None, execution_type: RequestBatchExecutionType = None, variables: dict = None, chunk_size: int = None, chunk_bytes: int = None, max_in_flight: int = 4, compact: bool = False):
+        return self._run(self.client.call_batch(requests, timeout, halt_on_failure, execution_type, variables, chunk_size, chunk_bytes, max_in_flight, compact))
+
+    def emit_batch(self, requests: list, halt_on_failure: bool = None, execution_type: RequestBatchExecutionType = None, variables: dict = None):
+        return self._run(self.client.emit_batch(requests, halt_on_failure, execution_type, variables))
+
+    def call_template(self, template: RequestTemplate, values: dict = None, timeout: int = 15):
+        return self._run(self.client.call_template(template, values, timeout))
+
+    def emit_template(self, template: RequestTemplate, values: dict = None):
+        return self._run(self.client.emit_template(template, values))
+
+    def register_event_callback(self, callback, event: str = None):
+        if inspect.iscoroutinefunction(callback):
+            wrapper = callback # Runs on the event loop thread
+        else:
+            wrapper = self._make_callback_wrapper(callback, 1 if event != None else len(signature(callback).parameters))
+        with self.lock:
+            self.callbacks[(callback, event)] = wrapper
+        self._run(self._call_soon(self.client.register_event_callback, wrapper, event))
+
+    def deregister_event_callback(self, callback, event: str = None):
+        with self.lock:
+            wrappers = [(key, wrapper) for key, wrapper in self.callbacks.items() if key[0] == callback and (event == None or key[1] == event)]
+            for key, wrapper in wrappers:
+                del self.callbacks[key]
+        for (c, e), wrapper in wrappers:
+            self._run(self._call_soon(self.client.deregister_event_callback, wrapper, e))
+
+    def _make_callback_wrapper(self, callback, params: int):
+        # The client dispatches catch-all callbacks by their number of parameters, so the wrapper must keep it
+        def submit(*args):
+            self.callback_executor.submit(callback, *args).add_done_callback(_log_callback_exception)
+        if params == 1:
+            async def wrapper(a):
+                submit(a)
+        elif params == 2:
+            async def wrapper(a, b):
+                submit(a, b)
+        elif params == 3:
+            async def wrapper(a, b, c):
+                submit(a, b, c)
+        else:
+            raise EventRegistrationError('Event callbacks must take 1 to 3 parameters')
+        return wrapper
+
+def transform_keyframe_frames(scene_name: str, scene_item_id: int, keyframes: list):
+    # Linearly interpolates numeric transform fields between (frame, transform dict) keyframes, yielding one request list per frame
+    keyframes = sorted(keyframes, key=lambda keyframe: keyframe[0])
+    for (start_frame, start), (end_frame, end) in zip(keyframes, keyframes[1:]):
+        length = end_frame - start_frame
+        for frame in range(length):
+            progress = frame / length
+            transform = {field: value + (end[field] - value) * progress for field, value in start.items() if field in end}
+            yield [Request('SetSceneItemTransform', {'sceneName': scene_name, 'sceneItemId': scene_item_id, 'sceneItemTransform': transform})]
+    if keyframes:
+        yield [Request('SetSceneItemTransform', {'sceneName': scene_name, 'sceneItemId': scene_item_id, 'sceneItemTransform': dict(keyframes[-1][1])})]
+
+class FrameScheduler:
+    MAX_SLEEP_FRAMES = 10000 # Upper bound of Sleep.sleepFrames in obs-websocket
+
+    def __init__(self, client: WebSocketClient, frames, frame_rate: float = None, batch_frames: int = 60, min_batch_frames: int = 15, max_batch_frames: int = 600, timeout: int = 15):
+        self.client = client
+        self.frames = frames
+        self.frame_rate = frame_rate
+        self.batch_frames = batch_frames
+        self.min_batch_frames = min_batch_frames
+        self.max_batch_frames = max_batch_frames
+        self.timeout = timeout
+
+        self.rtt = 0
+        self.stopped = False
+        self.on_time_batches = 0
+        self.stats = {'batches': 0, 'frames': 0, 'late_batches': 0, 'late_frames': 0, 'dropped_frames': 0}
+
+    def stop(self):
+        self.stopped = True
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        video_settings = await self.client.call(Request('GetVideoSettings'), timeout = self.timeout) # Also measures the round-trip time, so it is sent even with a frame_rate
+        self.rtt = loop.time() - start
+        if self.frame_rate == None:
+            if not video_settings.ok():
+                raise FrameSchedulerError('Failed to fetch the video frame rate. Code: {}'.format(video_settings.requestStatus.code))
+            self.frame_rate = video_settings.responseData['fpsNumerator'] / video_settings.responseData['fpsDenominator']
+        frame_time = 1 / self.frame_rate
+
+        frames = iter(self.frames)
+        in_flight = collections.deque() # (task, expected end time, request count, frame count)
+        previous_end = None
+        exhausted = False
+        while True:
+            # Keep one batch queued behind the one being executed. obs-websocket executes request batches concurrently,
+            # so the queued batch starts with a Sleep covering the remaining frames of the running one.
+            while len(in_flight) < 2 and not exhausted and not self.stopped:
+                batch = list(itertools.islice(frames, self.batch_frames))
+                if not batch:
+                    exhausted = True
+                    break
+                content_start = loop.time() + self.rtt / 2
+                lead_frames = 0
+                if previous_end != None and previous_end > content_start:
+                    lead_frames = min(round((previous_end - content_start) / frame_time), self.MAX_SLEEP_FRAMES)
+                    content_start += lead_frames * frame_time
+                previous_end = content_start + len(batch) * frame_time
+                requests = []
+                if lead_frames:
+                    requests.append(Request('Sleep', {'sleepFrames': lead_frames}))
+                for frame in batch:
+                    if isinstance(frame, (Request, CompactRequest)):
+                        requests.append(frame)
+                    else:
+                        requests.extend(frame)
+                    requests.append(Request('Sleep', {'sleepFrames': 1}))
+                task = asyncio.create_task(self.client.call_batch(requests, timeout = self.timeout + len(requests) * frame_time, halt_on_failure = True, execution_type = RequestBatchExecutionType.SerialFrame, compact = True))
+                in_flight.append((task, previous_end, len(requests), len(batch), lead_frames))
+                self.stats['batches'] += 1
+                self.stats['frames'] += len(batch)
+            if not in_flight:
+                break
+            task, expected_end, request_count, frame_count, lead_frames = in_flight.popleft()
+            try:
+                results = await task
+            except asyncio.CancelledError:
+                for pending in in_flight:
+                    pending[0].cancel()
+                raise
+            except (MessageTimeout, ConnectionLostError, NotIdentifiedError) as e:
+                log.warning('Frame batch failed: {}'.format(e))
+                self.stats['dropped_frames'] += frame_count
+                previous_end = None
+                continue
+            if len(results) != request_count or not results[-1].ok():
+                completed = sum(1 for result in results.results if result['requestStatus']['result'] and result['requestType'] == 'Sleep') - (1 if lead_frames else 0)
+                self.stats['dropped_frames'] += frame_count - max(0, min(completed, frame_count))
+            # The response arrives half a round trip after the batch completed
+            lateness = loop.time() - self.rtt / 2 - expected_end
+            late_frames = round(lateness / frame_time)
+            if late_frames > 0:
+                self.stats['late_batches'] += 1
+                self.stats['late_frames'] += late_frames
+                # Frames skipped by OBS delay the queued batch by the same amount, so shift the expectations along
+                if previous_end != None:
+                    previous_end += lateness
+                in_flight = collections.deque((t, end + lateness, r, f, l) for t, end, r, f, l in in_flight)
+                self.batch_frames = min(int(self.batch_frames * 1.5), self.max_batch_frames)
+                self.on_time_batches = 0
+            else:
+                self.on_time_batches += 1
+                if self.on_time_batches >= 10:
+                    self.batch_frames = max(int(self.batch_frames * 0.9), self.min_batch_frames)
+                    self.on_time_batches = 0
+        return self.stats
+
+@dataclass
+class Screenshot:
+    source: str
+    data: bytes # Image file bytes, or whatever the decoder of the ScreenshotPipeline returned
+    captured_at: float # Loop time at which the capture was requested
+    sequence: int # Capture round, increasing
+
+def _decode_screenshot_batch(message, decoder = None):
+    # Runs in an executor. Strings are left as bytes (raw=True), so the image data is never decoded as UTF-8 nor copied before base64 decoding.
+    images = {}
+    if type(message) == bytes:
+        for result in msgpack.unpackb(message, raw = True)[b'd'][b'results']:
+            if not result[b'requestStatus'][b'result']:
+                continue
+            image_data = result[b'responseData'][b'imageData']
+            image = binascii.a2b_base64(memoryview(image_data)[image_data.index(b',') + 1:])
+            images[int(result[b'requestId'])] = decoder(image) if decoder != None else image
+    else: # Response data already decoded by the receive task, with the json protocol
+        for result in message['results']:
+            if not result['requestStatus']['result']:
+                continue
+            image_data = result['responseData']['imageData']
+            image = binascii.a2b_base64(image_data[image_data.index(',') + 1:])
+            images[int(result['requestId'])] = decoder(image) if decoder != None else image
+    return images
+
+class ScreenshotPipeline:
+    def __init__(self, client: WebSocketClient, sources: list, rate: float = 1, image_format: str = 'jpg', width: int = None, height: int = None, compression_quality: int = None, batch_size: int = 16, max_in_flight: int = 32, executor = None, decoder = None, timeout: int = 15):
+        self.client = client
+        self.sources = list(sources)
+        self.rate = rate
+        self.image_format = image_format
+        self.width = width
+        self.height = height
+        self.compression_quality = compression_quality
+        self.batch_size = batch_size
+        self.max_in_flight = max_in_flight
+        self.executor = executor
+        self.decoder = decoder
+        self.timeout = timeout
+
+        self.task = None
+        self.capture_tasks = set()
+        self.in_flight = 0
+        self.sequence = 0
+        self.screenshots = {} # source -> latest Screenshot
+        self.stream = EventStream(None, maxsize = 1 << 16, policy = EventStreamPolicy.Latest, key = lambda screenshot: screenshot.source)
+        self.captured = 0
+        self.stale = 0
+        self.skipped = 0
+        self.failed = 0
+
+    async def start(self):
+        if self.task == None:
+            self.task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self.task == None:
+            return
+        self.task.cancel()
+        for task in list(self.capture_tasks):
+            task.cancel()
+        await asyncio.gather(self.task, *self.capture_tasks, return_exceptions = True)
+        self.task = None
+        self.stream.close()
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.stop()
+
+    def __aiter__(self):
+        return self.stream.__aiter__()
+
+    def latest(self, source: str):
+        return self.screenshots.get(source)
+
+    def stats(self):
+        return {
+            'captured': self.captured,
+            'dropped': self.stale + self.stream.coalesced, # Finished after a newer capture, or replaced before being consumed
+            'skipped': self.skipped,
+            'failed': self.failed,
+            'in_flight': self.in_flight
+        }
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        next_round = loop.time()
+        while True:
+            self.sequence += 1
+            sources = self.sources
+            if not self.client.identified:
+                self.skipped += len(sources)
+                sources = ()
+            for i in range(0, len(sources), self.batch_size):
+                batch = sources[i:i + self.batch_size]
+                # Rounds are skipped rather than queued, so that a slow OBS or decoder never builds up a backlog
+                if self.in_flight and self.in_flight + len(batch) > self.max_in_flight:
+                    self.skipped += len(batch)
+                    continue
+                task = asyncio.create_task(self._capture(batch, self.sequence, loop.time()))
+                self.capture_tasks.add(task)
+                task.add_done_callback(self.capture_tasks.discard)
+            next_round += 1 / self.rate
+            delay = next_round - loop.time()
+            if delay < 0:
+                next_round = loop.time() # Fell behind, do not try to catch up
+                delay = 0
+            await asyncio.sleep(delay)
+
+    async def _capture(self, sources: list, sequence: int, captured_at: float):
+        self.in_flight += len(sources)
+        try:
+            requests = []
+            for i, source in enumerate(sources):
+                request_data = {'sourceName': source, 'imageFormat': self.image_format}
+                if self.width != None:
+                    request_data['imageWidth'] = self.width
+                if self.height != None:
+                    request_data['imageHeight'] = self.height
+                if self.compression_quality != None:
+                    request_data['imageCompressionQuality'] = self.compression_quality
+                requests.append({'requestType': 'GetSourceScreenshot', 'requestId': str(i), 'requestData': request_data})
+            message = await self.client._call_batch_payloads(requests, self.timeout, None, RequestBatchExecutionType.Parallel, None, raw = True)
+            images = await asyncio.get_running_loop().run_in_executor(self.executor, _decode_screenshot_batch, message, self.decoder)
+        except (MessageTimeout, ConnectionLostError, websockets.exceptions.ConnectionClosed) as e:
+            log.debug('Failed to capture screenshots: {}'.format(e))
+            self.failed += len(sources)
+            return
+        except Exception:
+            log.exception('Failed to decode screenshots:\n')
+            self.failed += len(sources)
+            return
+        finally:
+            self.in_flight -= len(sources)
+        self.failed += len(sources) - len(images)
+        if self.client.metrics != None and len(images) < len(sources):
+            self.client.metrics.errors['GetSourceScreenshot'] += len(sources) - len(images)
+        for i, image in images.items():
+            source = sources[i]
+            previous = self.screenshots.get(source)
+            if previous != None and previous.sequence > sequence:
+                self.stale += 1
+                continue
+            screenshot = Screenshot(source, image, captured_at, sequence)
+            self.screenshots[source] = screenshot
+            self.stream._offer(screenshot)
+            self.captured += 1
+
+def _require_numpy():
+    global numpy
+    if numpy != None:
+        return
+    try:
+        import numpy
+    except ImportError:
+        raise ImportError('NumPy is required for animations. Install it with `pip install simpleobsws[animation]`.') from None
+
+def _ease_out_bounce(t):
+    return numpy.select(
+        [t < 1 / 2.75, t < 2 / 2.75, t < 2.5 / 2.75],
+        [7.5625 * t * t, 7.5625 * (t - 1.5 / 2.75) ** 2 + 0.75, 7.5625 * (t - 2.25 / 2.75) ** 2 + 0.9375],
+        7.5625 * (t - 2.625 / 2.75) ** 2 + 0.984375
+    )
+
+# Easing functions, vectorized over arrays of progress values from 0 to 1
+EASINGS = {
+    'linear': lambda t: t,
+    'in_quad': lambda t: t * t,
+    'out_quad': lambda t: t * (2 - t),
+    'in_out_quad': lambda t: numpy.where(t < 0.5, 2 * t * t, 1 - (-2 * t + 2) ** 2 / 2),
+    'in_cubic': lambda t: t ** 3,
+    'out_cubic': lambda t: 1 - (1 - t) ** 3,
+    'in_out_cubic': lambda t: numpy.where(t < 0.5, 4 * t ** 3, 1 - (-2 * t + 2) ** 3 / 2),
+    'in_sine': lambda t: 1 - numpy.cos(t * numpy.pi / 2),
+    'out_sine': lambda t: numpy.sin(t * numpy.pi / 2),
+    'in_out_sine': lambda t: -(numpy.cos(numpy.pi * t) - 1) / 2,
+    'out_back': lambda t: 1 + 2.70158 * (t - 1) ** 3 + 1.70158 * (t - 1) ** 2,
+    'out_elastic': lambda t: numpy.where((t == 0) | (t == 1), t, 2 ** (-10 * t) * numpy.sin((t * 10 - 0.75) * (2 * numpy.pi / 3)) + 1),
+    'out_bounce': _ease_out_bounce,
+    'in_bounce': lambda t: 1 - _ease_out_bounce(1 - t),
+    'in_out_bounce': lambda t: numpy.where(t < 0.5, (1 - _ease_out_bounce(1 - 2 * t)) / 2, (1 + _ease_out_bounce(2 * t - 1)) / 2),
+}
+
+def ease(t, easing = 'linear'):
+    _require_numpy()
+    t = numpy.asarray(t, dtype = float)
+    if callable(easing):
+        return easing(t)
+    return EASINGS[easing](t)
+
+class Animation:
+    INTEGER_FIELDS = frozenset(['cropLeft', 'cropRight', 'cropTop', 'cropBottom'])
+
+    def __init__(self, frames: int):
+        _require_numpy()
+        self.frame_count = frames
+        self.tracks = {} # (sceneName, sceneItemId) or (sourceName, filterName) -> {field -> array of values per frame, NaN when unset}
+        self.filter_targets = set()
+
+    def tween(self, items: list, field: str, start, end, easing = 'linear', start_frame: int = 0, end_frame: int = None):
+        end_frame = self.frame_count if end_frame == None else end_frame
+        progress = ease(numpy.linspace(0, 1, end_frame - start_frame), easing)
+        start = numpy.broadcast_to(numpy.asarray(start, dtype = float), (len(items),))
+        end = numpy.broadcast_to(numpy.asarray(end, dtype = float), (len(items),))
+        self._write(items, field, start_frame, start[None, :] + (end - start)[None, :] * progress[:, None])
+        return self
+
+    def path(self, items: list, points, easing = 'linear', start_frame: int = 0, end_frame: int = None, offsets = None):
+        # Moves the items along a polyline at constant speed (before easing). Offsets are added per item.
+        end_frame = self.frame_count if end_frame == None else end_frame
+        points = numpy.asarray(points, dtype = float)
+        distances = numpy.concatenate(([0], numpy.cumsum(numpy.hypot(*numpy.diff(points, axis = 0).T))))
+        travelled = ease(numpy.linspace(0, 1, end_frame - start_frame), easing) * distances[-1]
+        x = numpy.interp(travelled, distances, points[:, 0])
+        y = numpy.interp(travelled, distances, points[:, 1])
+        offsets = numpy.zeros((len(items), 2)) if offsets is None else numpy.asarray(offsets, dtype = float)
+        self._write(items, 'positionX', start_frame, x[:, None] + offsets[None, :, 0])
+        self._write(items, 'positionY', start_frame, y[:, None] + offsets[None, :, 1])
+        return self
+
+    def bounce(self, items: list, positions, velocities, bounds, start_frame: int = 0, end_frame: int = None):
+        # Moves the items at a constant velocity (in pixels per frame), bouncing off the edges of bounds
+        # (the (width, height) of the area available to the item's position, per item or shared)
+        end_frame = self.frame_count if end_frame == None else end_frame
+        frames = numpy.arange(1, end_frame - start_frame + 1, dtype = float)[:, None, None]
+        positions = numpy.asarray(positions, dtype = float).reshape(len(items), 2)[None]
+        velocities = numpy.asarray(velocities, dtype = float).reshape(len(items), 2)[None]
+        bounds = numpy.broadcast_to(numpy.asarray(bounds, dtype = float), (len(items), 2))[None]
+        folded = numpy.mod(positions + velocities * frames, 2 * bounds) # Reflecting off both edges is a triangle wave
+        values = numpy.where(folded > bounds, 2 * bounds - folded, folded)
+        self._write(items, 'positionX', start_frame, values[:, :, 0])
+        self._write(items, 'positionY', start_frame, values[:, :, 1])
+        return self
+
+    def opacity(self, filters: list, start, end, easing = 'linear', start_frame: int = 0, end_frame: int = None):
+        # filters is a list of (sourceName, filterName) of Color Correction filters, whose `opacity` setting is animated
+        self.filter_targets.update(filters)
+        return self.tween(filters, 'opacity', start, end, easing, start_frame, end_frame)
+
+    def frames(self):
+        # Built one field at a time rather than one frame at a time: the frames where a field is set are found with NumPy,
+        # and its values are converted to Python in one go, then stored into the payload of each of those frames
+        columns = []
+        gaps = False
+        for target, fields in self.tracks.items():
+            is_filter = target in self.filter_targets
+            payloads = [{} for frame in range(self.frame_count)]
+            for field, values in fields.items():
+                valid = ~numpy.isnan(values) # NaN is unset
+                if valid.all():
+                    targets = payloads
+                else:
+                    gaps = True
+                    targets = [payloads[frame] for frame in numpy.flatnonzero(valid).tolist()]
+                    values = values[valid]
+                for payload, value in zip(targets, values.tolist() if is_filter else self._column(field, values)):
+                    payload[field] = value
+            first, second = target
+            if is_filter:
+                columns.append([Request('SetSourceFilterSettings', {'sourceName': first, 'filterName': second, 'filterSettings': payload}) if payload else None for payload in payloads])
+            else:
+                columns.append([Request('SetSceneItemTransform', {'sceneName': first, 'sceneItemId': second, 'sceneItemTransform': payload}) if payload else None for payload in payloads])
+        if not columns:
+            for frame in range(self.frame_count):
+                yield []
+            return
+        for requests in zip(*columns):
+            yield [request for request in requests if request != None] if gaps else list(requests)
+
+    def requests(self, sleep_frames: bool = True):
+        ret = []
+        sleep = Request('Sleep', {'sleepFrames': 1})
+        for requests in self.frames():
+            ret.extend(requests)
+            if sleep_frames:
+                ret.append(sleep)
+        return ret
+
+    def _column(self, field, values):
+        # values has no NaN
+        if field not in self.INTEGER_FIELDS:
+            return values.tolist()
+        return numpy.round(values).astype(numpy.int64).tolist()
+
+    def _write(self, items, field, start_frame, values):
+        end_frame = start_frame + values.shape[0]
+        for i, item in enumerate(items):
+            fields = self.tracks.setdefault(tuple(item), {})
+            if field not in fields:
+                fields[field] = numpy.full(self.frame_count, numpy.nan)
+            fields[field][start_frame:end_frame] = values[:, i]
+
+class MockServer:
+    # Close codes of obs-websocket's WebSocketCloseCode
+    CLOSE_UNKNOWN_OPCODE = 4003
+    CLOSE_NOT_IDENTIFIED = 4007
+    CLOSE_ALREADY_IDENTIFIED = 4008
+    CLOSE_AUTHENTICATION_FAILED = 4009
+    CLOSE_UNSUPPORTED_RPC_VERSION = 4010
+
+    def __init__(self, host: str = 'localhost', port: int = 4455, password: str = None, latency: float = 0, response_size: int = 0, handlers: dict = None, frame_rate: float = 60):
+        self.host = host
+        self.port = port
+        self.password = password
+        self.latency = latency
+        self.response_size = response_size
+        self.handlers = {'GetVersion': self._get_version, 'Sleep': lambda request_data: None}
+        self.handlers.update(handlers or {})
+        self.frame_rate = frame_rate
+
+        self.server = None
+        self.sessions = {}
+        self.requests_received = 0
+        self.batches_received = 0
+        self.events_sent = 0
+
+    @property
+    def url(self):
+        return 'ws://{}:{}'.format(self.host, self.port)
+
+    async def start(self):
+        self.server = await websockets.serve(self._handle_connection, self.host, self.port, subprotocols = ['obswebsocket.msgpack', 'obswebsocket.json'], max_size = 2**24)
+        if self.port == 0:
+            self.port = next(iter(self.server.sockets)).getsockname()[1]
+
+    async def stop(self):
+        if self.server == None:
+            return
+        self.server.close()
+        await self.server.wait_closed()
+        self.server = None
+        self.sessions = {}
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.stop()
+
+    async def broadcast_event(self, event_type: str, event_data: dict = None):
+        subscription = EVENT_SUBSCRIPTIONS.get(event_type, EventSubscription.All)
+        payload = {'op': 5, 'd': {'eventType': event_type, 'eventIntent': subscription.value}}
+        if event_data != None:
+            payload['d']['eventData'] = event_data
+        encoded = {}
+        for ws, session in list(self.sessions.items()):
+            if not session['identified'] or not session['eventSubscriptions'] & subscription:
+                continue
+            if session['json'] not in encoded:
+                encoded[session['json']] = self._encode(payload, session['json'])
+            try:
+                await ws.send(encoded[session['json']])
+                self.events_sent += 1
+            except websockets.exceptions.ConnectionClosed:
+                pass
+
+    async def flood(self, event_type: str, event_data: dict = None, count: int = 1000, rate: float = None):
+        # Sends `count` events as fast as possible, or at `rate` events per second
+        start = time.monotonic()
+        for i in range(count):
+            await self.broadcast_event(event_type, event_data)
+            if rate:
+                delay = start + (i + 1) / rate - time.monotonic()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            elif i % 100 == 99:
+                await asyncio.sleep(0) # Lets the server handle requests in between
+
+    def _encode(self, payload: dict, use_json: bool):
+        if use_json:
+            return json.dumps(payload)
+        return msgpack.packb(payload)
+
+    def _get_version(self, request_data):
+        return {
+            'obsVersion': '30.0.0',
+            'obsWebSocketVersion': '5.3.0',
+            'rpcVersion': RPC_VERSION,
+            'availableRequests': sorted(self.handlers),
+            'supportedImageFormats': ['png', 'jpg'],
+            'platform': 'simpleobsws',
+            'platformDescription': 'MockServer'
+        }
+
+    def _get_latency(self):
+        if callable(self.latency):
+            return self.latency()
+        return self.latency
+
+    async def _handle_connection(self, ws):
+        session = {'json': ws.subprotocol == 'obswebsocket.json', 'identified': False, 'eventSubscriptions': EventSubscription.All}
+        self.sessions[ws] = session
+        hello = {'op': 0, 'd': {'obsWebSocketVersion': '5.3.0', 'rpcVersion': RPC_VERSION}}
+        if self.password:
+            session['salt'] = base64.b64encode(random.randbytes(32)).decode('utf-8')
+            session['challenge'] = base64.b64encode(random.randbytes(32)).decode('utf-8')
+            hello['d']['authentication'] = {'challenge': session['challenge'], 'salt': session['salt']}
+        tasks = set()
+        try:
+            await ws.send(self._encode(hello, session['json']))
+            async for message in ws:
+                try:
+                    payload = json.loads(message) if session['json'] else msgpack.unpackb(message)
+                    op_code = payload['op']
+                    data_payload = payload['d']
+                except (ValueError, KeyError, TypeError, msgpack.UnpackException):
+                    await ws.close(4002, 'The message could not be decoded.')
+                    break
+                if op_code == 1: # Identify
+                    if session['identified']:
+                        await ws.close(self.CLOSE_ALREADY_IDENTIFIED, 'You are already Identified with the obs-websocket server.')
+                        break
+                    if data_payload.get('rpcVersion') != RPC_VERSION:
+                        await ws.close(self.CLOSE_UNSUPPORTED_RPC_VERSION, 'Your requested RPC version is not supported by this server.')
+                        break
+                    if self.password and data_payload.get('authentication') != self._authentication_string(session):
+                        await ws.close(self.CLOSE_AUTHENTICATION_FAILED, 'Authentication failed.')
+                        break
+                    session['identified'] = True
+                    session['eventSubscriptions'] = data_payload.get('eventSubscriptions', EventSubscription.All.value)
+                    await ws.send(self._encode({'op': 2, 'd': {'negotiatedRpcVersion': RPC_VERSION}}, session['json']))
+                elif not session['identified']:
+                    await ws.close(self.CLOSE_NOT_IDENTIFIED, 'You must finish Identification before sending this message.')
+                    break
+                elif op_code == 3: # Reidentify
+                    session['eventSubscriptions'] = data_payload.get('eventSubscriptions', session['eventSubscriptions'])
+                    await ws.send(self._encode({'op': 2, 'd': {'negotiatedRpcVersion': RPC_VERSION}}, session['json']))
+                elif op_code == 6 or op_code == 8:
+                    # Requests are answered concurrently, so that latency does not serialize them
+                    task = asyncio.create_task(self._handle_request(ws, session, op_code, data_payload))
+                    tasks.add(task)
+                    task.add_done_callback(tasks.discard)
+                else:
+                    await ws.close(self.CLOSE_UNKNOWN_OPCODE, 'Unknown OpCode.')
+                    break
+        except websockets.exceptions.ConnectionClosed:
+            pass
+        finally:
+            for task in tasks:
+                task.cancel()
+            self.sessions.pop(ws, None)
+
+    def _authentication_string(self, session: dict):
+        secret = base64.b64encode(hashlib.sha256((self.password + session['salt']).encode('utf-8')).digest())
+        return base64.b64encode(hashlib.sha256(secret + session['challenge'].encode('utf-8')).digest()).decode('utf-8')
+
+    async def _handle_request(self, ws, session: dict, op_code: int, data_payload: dict):
+        latency = self._get_latency()
+        if latency:
+            await asyncio.sleep(latency)
+        if op_code == 6:
+            self.requests_received += 1
+            response = {'op': 7, 'd': await self._process_request(data_payload, None)}
+            response['d']['requestId'] = data_payload.get('requestId')
+        else:
+            self.batches_received += 1
+            response = {'op': 9, 'd': {'requestId': data_payload.get('requestId'), 'results': await self._process_batch(data_payload)}}
+        try:
+            await ws.send(self._encode(response, session['json']))
+        except websockets.exceptions.ConnectionClosed:
+            pass
+
+    async def _process_batch(self, data_payload: dict):
+        execution_type = data_payload.get('executionType', RequestBatchExecutionType.SerialRealtime.value)
+        requests = data_payload.get('requests', [])
+        if execution_type == RequestBatchExecutionType.Parallel.value:
+            return list(await asyncio.gather(*(self._process_request(request, None) for request in requests)))
+        variables = dict(data_payload.get('variables') or {})
+        results = []
+        for request in requests:
+            request_data = dict(request.get('requestData') or {})
+            for input_name, variable_name in (request.get('inputVariables') or {}).items():
+                if variable_name in variables:
+                    request_data[input_name] = variables[variable_name]
+            if request.get('requestType') == 'Sleep':
+                if execution_type == RequestBatchExecutionType.SerialFrame.value and 'sleepFrames' in request_data:
+                    await asyncio.sleep(request_data['sleepFrames'] / self.frame_rate)
+                elif execution_type == RequestBatchExecutionType.SerialRealtime.value and 'sleepMillis' in request_data:
+                    await asyncio.sleep(request_data['sleepMillis'] / 1000)
+            result = await self._process_request(request, request_data)
+            results.append(result)
+            response_data = result.get('responseData')
+            if response_data:
+                for variable_name, response_field in (request.get('outputVariables') or {}).items():
+                    if response_field in response_data:
+                        variables[variable_name] = response_data[response_field]
+            if not result['requestStatus']['result'] and data_payload.get('haltOnFailure'):
+                break
+        return results
+
+    async def _process_request(self, request: dict, request_data: dict):
+        request_type = request.get('requestType')
+        if request_data == None:
+            request_data = request.get('requestData')
+        result = {'requestType': request_type, 'requestStatus': {'result': True, 'code': 100}}
+        if 'requestId' in request:
+            result['requestId'] = request['requestId']
+        handler = self.handlers.get(request_type)
+        if handler == None:
+            response_data = {'data': 'x' * self.response_size} if self.response_size else None
+        else:
+            response_data = handler(request_data)
+            if inspect.isawaitable(response_data):
+                response_data = await response_data
+        if isinstance(response_data, RequestStatus):
+            result['requestStatus'] = {'result': response_data.result, 'code': response_data.code}
+            if response_data.comment != None:
+                result['requestStatus']['comment'] = response_data.comment
+        elif response_data != None:
+            result['responseData'] = response_data
+        return result
+
+class SessionReplayer:
+    def __init__(self, path: str):
+        self.path = path
+
+    def frames(self):
+        return read_session_log(self.path)
+
+    async def replay_events(self, client: WebSocketClient, speed: float = 1.0):
+        # Events go through the same path as events received from obs-websocket, including lazy decoding and metrics
+        count = 0
+        start = time.monotonic()
+        async for frame in self._paced_events(speed):
+            try:
+                await client._handle_message(frame.data)
+            except (ValueError, msgpack.UnpackException):
+                continue
+            count += 1
+        return {'events': count, 'elapsed': time.monotonic() - start}
+
+    async def serve_events(self, server: MockServer, speed: float = 1.0):
+        count = 0
+        async for frame in self._paced_events(speed):
+            data_payload = frame.decode()['d']
+            await server.broadcast_event(data_payload['eventType'], data_payload.get('eventData'))
+            count += 1
+        return count
+
+    def responses(self):
+        # Recorded results of every request type, in order
+        responses = {}
+        for frame in self.frames():
+            if not frame.inbound:
+                continue
+            payload = frame.decode()
+            if payload['op'] == 7:
+                results = (payload['d'],)
+            elif payload['op'] == 9:
+                results = payload['d']['results']
+            else:
+                continue
+            for result in results:
+                responses.setdefault(result['requestType'], []).append(result)
+        return responses
+
+    def handlers(self):
+        # MockServer handlers which answer each request type with its recorded responses, in a loop
+        handlers = {}
+        for request_type, results in self.responses().items():
+            handlers[request_type] = self._make_handler(itertools.cycle(results))
+        return handlers
+
+    def mock_server(self, **kwargs):
+        handlers = self.handlers()
+        handlers.update(kwargs.pop('handlers', None) or {})
+        return MockServer(handlers = handlers, **kwargs)
+
+    def _make_handler(self, results):
+        def handler(request_data):
+            result = next(results)
+            status = result['requestStatus']
+            if not status['result']:
+                return RequestStatus(False, status['code'], status.get('comment'))
+            return result.get('responseData')
+        return handler
+
+    async def _paced_events(self, speed: float):
+        first_timestamp = None
+        start = time.monotonic()
+        for frame in self.frames():
+            if not frame.inbound or not self._is_event(frame):
+                continue
+            if speed:
+                if first_timestamp == None:
+                    first_timestamp = frame.timestamp
+                delay = start + (frame.timestamp - first_timestamp) / 1e9 / speed - time.monotonic()
+                await asyncio.sleep(max(delay, 0))
+            else:
+                await asyncio.sleep(0) # Lets callback tasks run, as they would between received messages
+            yield frame
+
+    def _is_event(self, frame: RecordedFrame):
+        if type(frame.data) == str:
+            return json.loads(frame.data).get('op') == 5
+        try:
+            return _peek_message(frame.data)[1] != None
+        except (ValueError, msgpack.UnpackException):
+            return False